@@ -6,8 +6,11 @@ Analyze the HTML structure to find the Release Year field properly
 import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 
-def analyze_release_year_structure(url):
+from aristohk_archive import PageArchive
+
+def analyze_release_year_structure(url, archive=None):
     """Analyze how Release Year appears in the HTML structure"""
     
     print(f"Analyzing Release Year structure for: {url}")
@@ -18,10 +21,14 @@ def analyze_release_year_structure(url):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        def fetch(url):
+            response = requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
+            return response.content
+        
+        content = archive.get_or_fetch(url, fetch) if archive else fetch(url)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
         
         # Look for all text containing "Release Year"
         all_text = soup.get_text()
@@ -106,6 +113,9 @@ def analyze_release_year_structure(url):
         print(f"Error: {e}")
 
 if __name__ == "__main__":
+    # Optional first argument: an archive written by aristohk_scraper.py --archive
+    archive = PageArchive(sys.argv[1]) if len(sys.argv) > 1 else None
+    
     # Test URLs from the images
     test_urls = [
         "https://aristohk.com/rolex/126231-0023/23914",  # Should have Release Year: 2018
@@ -113,5 +123,5 @@ if __name__ == "__main__":
     ]
     
     for url in test_urls:
-        analyze_release_year_structure(url)
+        analyze_release_year_structure(url, archive)
         print("\n" + "="*80 + "\n")
\ No newline at end of file
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Append-only archive of fetched pages (WARC-like) with random access.
+
+The archive is a WARC/1.1 file in which every record is its own gzip member,
+so the file as a whole reads like any .warc.gz and each record can be
+decompressed on its own. Records are "response" records holding the HTTP
+status line, headers and body of one page.
+
+Next to it, <archive>.idx holds one JSON line per record:
+
+    {"url": "https://aristohk.com/rolex/126500-ln-0002/18692", "id": 18692,
+     "offset": 1234, "length": 20480, "status": 200, "date": "2024-05-01T08:00:00Z"}
+
+Readers memory-map the archive and decompress only the member a lookup
+points at, by URL or by product ID; the latest record of a URL wins. If the
+index is missing or behind the archive (e.g. after a crash between the two
+writes) the tail is re-indexed by scanning the gzip members.
+
+An archive is opened read-only unless `writable=True`. Readers never modify
+either file, so they are safe to point at an archive a crawl is still
+writing: a torn record at the end is simply not indexed. Writers append each
+record under an exclusive flock on the archive, at its size at that moment,
+so several crawls can extend one archive (on platforms without flock, such
+as Windows, only one may write at a time). Opening for writing also repairs
+the files under that lock: a torn tail is truncated and records missing
+from the index are added to it.
+
+Usage:
+    python aristohk_archive.py crawl.warc.gz list
+    python aristohk_archive.py crawl.warc.gz get 18692 > page.html
+    python aristohk_archive.py crawl.warc.gz export corpus/
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import sys
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from aristohk_corpus import save_corpus
+from aristohk_urls import canonical_url, product_id_from_url
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: there, one process at a time may write an archive
+    fcntl = None
+
+INDEX_SUFFIX = '.idx'
+COMPRESS_LEVEL = 6
+# Compressed bytes fed to the decompressor at a time when scanning for records
+SCAN_CHUNK = 64 * 1024
+
+
+class ArchivedPage:
+    """One archived response."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, date: str):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.date = date
+
+
+def _warc_record(url: str, status: int, headers: Mapping[str, str], body: bytes, date: str) -> bytes:
+    """Serialize a WARC response record (uncompressed)."""
+    reason = HTTPStatus(status).phrase if status in HTTPStatus._value2member_map_ else ''
+    http = [f"HTTP/1.1 {status} {reason}".rstrip()]
+    for name, value in (headers or {}).items():
+        # The body is stored decoded, so drop headers that describe the wire encoding
+        if name.lower() not in ('content-encoding', 'transfer-encoding', 'content-length'):
+            http.append(f"{name}: {value}")
+    http.append(f"Content-Length: {len(body)}")
+    block = ('\r\n'.join(http) + '\r\n\r\n').encode('utf-8') + body
+    warc = [
+        'WARC/1.1',
+        'WARC-Type: response',
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {date}",
+        f"WARC-Target-URI: {url}",
+        'Content-Type: application/http;msgtype=response',
+        f"Content-Length: {len(block)}",
+    ]
+    return ('\r\n'.join(warc) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def _parse_record(record: bytes) -> Optional[ArchivedPage]:
+    """Parse an uncompressed WARC response record; None for other record types."""
+    warc_head, _, rest = record.partition(b'\r\n\r\n')
+    fields = dict(line.split(': ', 1) for line in warc_head.decode('utf-8').split('\r\n')[1:] if ': ' in line)
+    if fields.get('WARC-Type') != 'response':
+        return None
+    block = rest[:int(fields['Content-Length'])]
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    lines = http_head.decode('utf-8', errors='replace').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+    return ArchivedPage(fields['WARC-Target-URI'], status, headers, body, fields.get('WARC-Date', ''))
+
+
+class PageArchive:
+    """Append pages to a compressed archive and read them back by URL or product ID."""
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.writable = writable
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self.ids: Dict[int, str] = {}
+        self._file = None
+        self._index_file = None
+        self._map = None
+        if writable:
+            self._file = open(self.path, 'ab')
+            self._index_file = open(self.index_path, 'ab')
+            with self._exclusive():
+                self._load_index(repair=True)
+        else:
+            self._load_index()
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the archive's exclusive flock, shared with writers in other processes."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _add_entry(self, entry: Dict):
+        self.entries[canonical_url(entry['url'])] = entry
+        if entry.get('id') is not None:
+            self.ids[entry['id']] = entry['url']
+
+    def _load_index(self, repair: bool = False):
+        """Read the index and scan the archive past its end; `repair` writes the fixes back (needs the lock)."""
+        indexed_end = 0
+        valid_index = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # A torn last line; the scan below recovers it
+                    if not line.endswith(b'\n'):
+                        break
+                    valid_index += len(line)
+                    self._add_entry(entry)
+                    indexed_end = max(indexed_end, entry['offset'] + entry['length'])
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if repair and os.path.exists(self.index_path) and os.path.getsize(self.index_path) > valid_index:
+            os.truncate(self.index_path, valid_index)
+        if size > indexed_end:
+            self._reindex_from(indexed_end, repair)
+
+    def _reindex_from(self, offset: int, repair: bool = False):
+        """Index the gzip members after `offset`, stopping at a torn record at the end.
+
+        With `repair` the torn record is truncated and the recovered entries are appended to the index.
+        """
+        end = os.path.getsize(self.path)
+        data = self._mapped(end)
+        position = offset
+        recovered = []
+        while position < end:
+            # Feed the member to the decompressor a chunk at a time, so only one record is ever in memory
+            decompressor = zlib.decompressobj(wbits=31)
+            parts = []
+            read = position
+            try:
+                while not decompressor.eof and read < end:
+                    chunk = data[read:read + SCAN_CHUNK]
+                    parts.append(decompressor.decompress(chunk))
+                    read += len(chunk)
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break
+            length = read - position - len(decompressor.unused_data)
+            page = _parse_record(b''.join(parts))
+            if page:
+                recovered.append({'url': page.url, 'id': product_id_from_url(page.url), 'offset': position,
+                                  'length': length, 'status': page.status, 'date': page.date})
+            position += length
+        for entry in recovered:
+            self._add_entry(entry)
+        if not repair:
+            return
+        if position < end:
+            # Unmap before cutting the torn record off
+            self._map.close()
+            self._map = None
+            os.truncate(self.path, position)
+        if recovered:
+            self._index_file.write(b''.join(json.dumps(entry).encode('utf-8') + b'\n' for entry in recovered))
+            self._index_file.flush()
+
+    def append(self, url: str, body: bytes, status: int = 200, headers: Mapping[str, str] = None):
+        """Compress and append one page, then index it."""
+        if not self.writable:
+            raise ValueError(f"{self.path} is open read-only")
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        member = gzip.compress(_warc_record(url, status, headers, body, date), compresslevel=COMPRESS_LEVEL)
+        with self.lock, self._exclusive():
+            # Other processes may have appended since; the file is opened for appending, so this is where it lands
+            offset = os.fstat(self._file.fileno()).st_size
+            self._file.write(member)
+            self._file.flush()
+            entry = {'url': url, 'id': product_id_from_url(url), 'offset': offset, 'length': len(member),
+                     'status': status, 'date': date}
+            self._index_file.write(json.dumps(entry).encode('utf-8') + b'\n')
+            self._index_file.flush()
+            self._add_entry(entry)
+
+    def _mapped(self, end: int) -> mmap.mmap:
+        """Return a read-only map of the archive covering at least `end` bytes."""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def record(self, key) -> Optional[ArchivedPage]:
+        """Return the latest archived response for a URL or product ID."""
+        url = self.ids.get(key) if isinstance(key, int) else key
+        entry = self.entries.get(canonical_url(url)) if url else None
+        if entry is None:
+            return None
+        with self.lock:
+            data = self._mapped(entry['offset'] + entry['length'])[entry['offset']:entry['offset'] + entry['length']]
+        return _parse_record(gzip.decompress(data))
+
+    def get(self, key) -> Optional[bytes]:
+        """Return the latest archived body for a URL or product ID."""
+        page = self.record(key)
+        return page.body if page else None
+
+    def get_or_fetch(self, url: str, fetch: Callable[[str], bytes]) -> bytes:
+        """Return the archived body of a URL, calling `fetch(url)` only if it is not in the archive."""
+        body = self.get(url)
+        return body if body is not None else fetch(url)
+
+    def __contains__(self, url: str) -> bool:
+        return canonical_url(url) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def urls(self) -> List[str]:
+        """Archived URLs in the order they were first written."""
+        return [entry['url'] for entry in sorted(self.entries.values(), key=lambda entry: entry['offset'])]
+
+    def pages(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield (url, body) for the latest record of every archived URL, like load_corpus."""
+        for url in self.urls():
+            yield url, self.get(url)
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._index_file.close()
+                self._file = self._index_file = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect a page archive written with --archive')
+    parser.add_argument('archive', help='Archive file (.warc.gz)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='List archived URLs with status and date')
+    get = commands.add_parser('get', help='Write the body of one page to stdout')
+    get.add_argument('key', help='URL or product ID')
+    export = commands.add_parser('export', help='Write the archived pages to a corpus directory')
+    export.add_argument('directory', help='Corpus directory to append to')
+
+    args = parser.parse_args()
+    if not os.path.exists(args.archive):
+        print(f"Error: {args.archive} does not exist")
+        sys.exit(1)
+    archive = PageArchive(args.archive)
+
+    if args.command == 'list':
+        for url in archive.urls():
+            entry = archive.entries[canonical_url(url)]
+            print(f"{entry['status']}  {entry['date']}  {url}")
+    elif args.command == 'get':
+        body = archive.get(int(args.key) if args.key.isdigit() else args.key)
+        if body is None:
+            print(f"Error: {args.key} is not in {args.archive}", file=sys.stderr)
+            sys.exit(1)
+        sys.stdout.buffer.write(body)
+    else:
+        saved = save_corpus(args.directory, archive.pages())
+        print(f"Exported {saved} pages to {args.directory}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
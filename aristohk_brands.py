@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cheap existence probes for candidate brand listings.
+
+Brand discovery adds a list of known brand slugs that the homepage may not
+link to. Rather than paginating those guesses with full fetches and parses,
+each candidate listing is probed once: the response status, where it was
+redirected to, and as little of the body as it takes to see a link
+parse_product_urls could pick up. A probe ends in one of
+
+    live     the listing exists and links to products
+    empty    the listing exists but its whole body has no product links
+    missing  404/410, or redirected to the homepage
+
+Anything inconclusive (other errors, a body too large to finish) keeps the
+brand. Results can be kept in a small JSON file and reused until their TTL
+expires.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+BRAND_LIVE = 'live'
+BRAND_EMPTY = 'empty'
+BRAND_MISSING = 'missing'
+
+DEFAULT_PROBE_TTL = 24 * 60 * 60
+PROBE_MAX_BYTES = 256 * 1024
+PROBE_CHUNK_SIZE = 16 * 1024
+PROBE_WORKERS = 8
+
+# Any href ending in a digit: a superset of every pattern parse_product_urls accepts
+_PRODUCT_LINK = re.compile(rb'href\s*=\s*["\']?[^"\'\s>]*/[^"\'\s>]*\d["\'\s>]', re.I)
+_OVERLAP = 1024
+
+
+class ProductLinkSniffer:
+    """Scan a listing body chunk by chunk for a product-like link."""
+
+    def __init__(self, max_bytes: int = PROBE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.read = 0
+        self.found = False
+        self._tail = b''
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan the next chunk; returns True once reading more is pointless."""
+        self.read += len(chunk)
+        # Keep the end of the previous chunk so links split across chunks are still seen
+        window = self._tail + chunk
+        if _PRODUCT_LINK.search(window):
+            self.found = True
+            return True
+        self._tail = window[-_OVERLAP:]
+        return self.read >= self.max_bytes
+
+    def result(self, complete: bool) -> Optional[str]:
+        """Classify the scanned body; `complete` says whether the whole body was read."""
+        if self.found:
+            return BRAND_LIVE
+        if complete and self.read < self.max_bytes:
+            return BRAND_EMPTY
+        return None
+
+
+def classify_probe(status: int, final_url: str, sniffer: ProductLinkSniffer, complete: bool) -> Optional[str]:
+    """Turn a probe response into live / empty / missing, or None when inconclusive."""
+    if status in (404, 410):
+        return BRAND_MISSING
+    if status >= 400:
+        return None
+    if urlparse(final_url).path in ('', '/'):
+        return BRAND_MISSING
+    return sniffer.result(complete)
+
+
+class BrandProbeCache:
+    """Probe results keyed by brand URL, optionally persisted to a JSON file between runs."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_PROBE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, brand_url: str) -> Optional[str]:
+        """Return the cached state of a brand listing if it is younger than the TTL."""
+        with self.lock:
+            entry = self.entries.get(brand_url)
+        if entry and time.time() - entry['checked_at'] < self.ttl:
+            return entry['state']
+        return None
+
+    def set(self, brand_url: str, state: str):
+        with self.lock:
+            self.entries[brand_url] = {'state': state, 'checked_at': time.time()}
+
+    def save(self):
+        """Write the results to disk, replacing the previous file atomically."""
+        if not self.path:
+            return
+        with self.lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp, self.path)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Circuit breakers that stop the crawler from hammering a failing site or section.
+
+Every request is checked against two breakers: one for its host and one for
+its brand section (the first path segment, e.g. /rolex). A breaker is
+
+    closed     requests go through; `threshold` consecutive failures open it
+               (for a host, only if they are not all in one brand section, so
+               one broken brand does not take the rest of the site down)
+    open       requests fail fast without being sent, for `reset_timeout` seconds
+    half-open  after that, a single probe request is let through: success
+               closes the breaker again, failure reopens it with the timeout
+               doubled (up to `max_timeout`); a probe that never reports back
+               is replaced by another one after the same timeout
+
+Failures are responses that did not come back (timeouts, connection errors)
+and 5xx answers; 404s and 429s mean the server is up and count as success
+(throttling is the rate controller's business).
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+MAX_RESET_TIMEOUT = 600.0
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class CircuitBreaker:
+    """State of one breaker; the registry's lock guards it."""
+
+    def __init__(self, reset_timeout: float):
+        self.state = CLOSED
+        self.failures = 0
+        # Brand sections of the consecutive failures (None for pages outside one)
+        self.sections: Set[Optional[str]] = set()
+        self.timeout = reset_timeout
+        # When the breaker last opened or sent its half-open probe
+        self.opened_at = 0.0
+
+
+def breaker_keys(url: str) -> List[Tuple[str, str]]:
+    """The (scope, name) breakers a URL falls under: its host, plus its brand section if it has one."""
+    parsed = urlparse(url)
+    keys = [('host', parsed.netloc)]
+    section = parsed.path.strip('/').split('/')[0]
+    if section and '.' not in section:
+        keys.append(('brand', f"{parsed.netloc}/{section}"))
+    return keys
+
+
+def _tripped(scope: str, breaker: CircuitBreaker, threshold: int) -> bool:
+    """Whether a closed breaker's consecutive failures are enough to open it."""
+    if breaker.failures < threshold:
+        return False
+    return scope != 'host' or len(breaker.sections) > 1 or None in breaker.sections
+
+
+class CircuitBreakers:
+    """Per-host and per-brand circuit breakers, shared by all fetch threads and tasks."""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 max_timeout: float = MAX_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_timeout = max(reset_timeout, max_timeout)
+        self.breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def _breaker(self, key: Tuple[str, str]) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.reset_timeout)
+        return self.breakers[key]
+
+    def allow(self, url: str) -> Optional[Tuple[str, str]]:
+        """Check a request against its breakers; returns the key of the one that refuses it, or None to go ahead.
+
+        An open breaker whose timeout has passed lets this request through as its half-open probe.
+        """
+        now = time.monotonic()
+        with self.lock:
+            breakers = [(key, self._breaker(key)) for key in breaker_keys(url)]
+            for key, breaker in breakers:
+                if breaker.state != CLOSED and now < breaker.opened_at + breaker.timeout:
+                    return key
+            for key, breaker in breakers:
+                if breaker.state != CLOSED:
+                    breaker.state, breaker.opened_at = HALF_OPEN, now
+                    logger.info(f"Circuit for {key[0]} {key[1]} half-open, probing with {url}")
+            return None
+
+    def record(self, url: str, ok: bool) -> List[Tuple[str, str]]:
+        """Report the outcome of an allowed request; returns the keys of breakers that opened because of it."""
+        opened = []
+        now = time.monotonic()
+        keys = breaker_keys(url)
+        section = keys[1][1] if len(keys) > 1 else None
+        with self.lock:
+            for key in keys:
+                breaker = self._breaker(key)
+                if ok:
+                    if breaker.state != CLOSED:
+                        logger.info(f"Circuit for {key[0]} {key[1]} closed again")
+                    breaker.state, breaker.failures, breaker.timeout = CLOSED, 0, self.reset_timeout
+                    breaker.sections.clear()
+                    continue
+                breaker.failures += 1
+                breaker.sections.add(section)
+                if breaker.state == HALF_OPEN:
+                    breaker.timeout = min(self.max_timeout, breaker.timeout * 2)
+                elif breaker.state == OPEN or not _tripped(key[0], breaker, self.threshold):
+                    continue
+                breaker.state, breaker.opened_at = OPEN, now
+                opened.append(key)
+                logger.warning(f"Circuit for {key[0]} {key[1]} open after {breaker.failures} failures; "
+                               f"failing fast for {breaker.timeout:.0f}s")
+        return opened
+
+    def open_breakers(self) -> List[Tuple[str, str]]:
+        """Keys of the breakers that are not closed."""
+        with self.lock:
+            return [key for key, breaker in self.breakers.items() if breaker.state != CLOSED]
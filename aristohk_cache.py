@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk HTTP response cache for the aristohk scraper.
+
+Responses are stored in a SQLite database keyed by canonical URL, together
+with their ETag / Last-Modified validators. A cached entry is served without
+any request while it is fresh (per --cache-ttl, or the response's
+Cache-Control max-age); otherwise it is revalidated with If-None-Match /
+If-Modified-Since so an unchanged page costs a 304 with no body.
+
+The database runs in WAL mode with a busy timeout, so two scraper runs on the
+same host can share one cache file. Bodies are stored zlib-compressed and
+their total stored size is capped, evicting the least recently used entries
+first.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Mapping, Optional
+
+from aristohk_urls import canonical_url
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _max_age(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the Cache-Control max-age of a response, if any."""
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-cache' in cache_control:
+        return 0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return float(match.group(1)) if match else None
+
+
+class CachedResponse:
+    """A cached body with the validators needed to revalidate it."""
+
+    def __init__(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str],
+                 stored_at: float, max_age: Optional[float]):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.max_age = max_age
+
+    def is_fresh(self, ttl: Optional[float] = None) -> bool:
+        """Check whether the entry can be served without revalidation."""
+        lifetime = ttl if ttl is not None else self.max_age
+        return bool(lifetime) and time.time() - self.stored_at < lifetime
+
+    def revalidation_headers(self) -> Dict[str, str]:
+        """Build the conditional request headers for this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """SQLite-backed response cache with conditional revalidation and LRU eviction."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach the worker threads' ones too
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Running total of the stored body sizes, so a store does not have to sum the table
+        self.total_bytes = 0
+        self._total_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    max_age REAL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    body BLOB NOT NULL
+                )
+            """)
+            # Covers both the size total and the LRU scan without touching the bodies
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access, size)")
+            self.total_bytes = self._stored_bytes(conn)
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the cache database."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only this thread uses it, but close() may run on another one
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached entry for a URL, marking it as recently used."""
+        key = canonical_url(url)
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT body, etag, last_modified, stored_at, max_age FROM responses WHERE url = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), key))
+        body, etag, last_modified, stored_at, max_age = row
+        return CachedResponse(key, zlib.decompress(body), etag, last_modified, stored_at, max_age)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """Check whether an entry can be served without a request."""
+        return entry.is_fresh(self.ttl)
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str]):
+        """Store a fresh 200 response, unless it is marked Cache-Control: no-store."""
+        if 'no-store' in headers.get('Cache-Control', ''):
+            self.discard(url)
+            return
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        compressed = zlib.compress(body)
+        now = time.time()
+        key = canonical_url(url)
+        conn = self._connection()
+        with conn:
+            replaced = conn.execute("SELECT size FROM responses WHERE url = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, size, etag, last_modified, max_age, stored_at, last_access, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, len(compressed), etag, last_modified, _max_age(headers), now, now, compressed)
+            )
+        with self._total_lock:
+            self.total_bytes += len(compressed) - (replaced[0] if replaced else 0)
+            over = self.total_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def discard(self, url: str):
+        """Drop a URL's entry, if any."""
+        key = canonical_url(url)
+        conn = self._connection()
+        with conn:
+            removed = conn.execute("SELECT size FROM responses WHERE url = ?", (key,)).fetchone()
+            conn.execute("DELETE FROM responses WHERE url = ?", (key,))
+        if removed:
+            with self._total_lock:
+                self.total_bytes -= removed[0]
+
+    def refresh(self, url: str, headers: Mapping[str, str]):
+        """Record a 304 Not Modified: the stored body is current again."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ?, max_age = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, _max_age(headers), headers.get('ETag'), headers.get('Last-Modified'), canonical_url(url))
+            )
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap."""
+        conn = self._connection()
+        with self._total_lock, conn:
+            # Re-sum once here: another run sharing the file may have stored or evicted entries
+            total = self._stored_bytes(conn)
+            if total > self.max_bytes:
+                evicted = []
+                for key, size in conn.execute("SELECT url, size FROM responses ORDER BY last_access"):
+                    evicted.append((key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+                conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+            self.total_bytes = total
+
+    def close(self):
+        """Close the connections of all threads; call once the threads are done with the cache."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            # Threads that use the cache again open new connections
+            self._local = threading.local()
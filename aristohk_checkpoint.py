@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Crash-safe crawl checkpoints for the aristohk scraper.
+
+A CrawlCheckpoint journals a crawl's progress to SQLite as it happens:
+
+    meta           run parameters and each brand's page count
+    listing_pages  brand listing pages that were fetched and parsed
+    frontier       every discovered product URL, with its listing page,
+                   status ('pending', 'done' or 'failed') and extracted product
+
+Every write is its own transaction, so after a crash or Ctrl-C the journal
+holds everything up to the last completed page. Resuming replays finished
+listing pages and products from the journal and only fetches what is left;
+failed product pages are retried.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from aristohk_record import compact, json_default
+
+
+class CrawlCheckpoint:
+    """SQLite journal of discovered listing pages, completed URLs and extracted products."""
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS listing_pages (brand TEXT, page INTEGER, PRIMARY KEY (brand, page))"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS frontier (
+                    url TEXT PRIMARY KEY,
+                    brand TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    product TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS frontier_page ON frontier (brand, page, position)")
+            if not resume:
+                for table in ('meta', 'listing_pages', 'frontier'):
+                    self.conn.execute(f"DELETE FROM {table}")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def run_params(self) -> Optional[Dict]:
+        """Return the parameters the journaled run was started with."""
+        value = self._get_meta('run_params')
+        return json.loads(value) if value else None
+
+    def set_run_params(self, params: Dict):
+        self._set_meta('run_params', json.dumps(params))
+
+    def total_pages(self, brand_slug: str) -> Optional[int]:
+        """Return the journaled page count of a brand, if known."""
+        value = self._get_meta(f"total_pages:{brand_slug}")
+        return int(value) if value is not None else None
+
+    def set_total_pages(self, brand_slug: str, total_pages: int):
+        self._set_meta(f"total_pages:{brand_slug}", str(total_pages))
+
+    def listing_page(self, brand_slug: str, page: int) -> Optional[List[str]]:
+        """Return the product URLs found on a journaled listing page, or None if it wasn't parsed yet."""
+        with self.lock:
+            if not self.conn.execute(
+                "SELECT 1 FROM listing_pages WHERE brand = ? AND page = ?", (brand_slug, page)
+            ).fetchone():
+                return None
+            rows = self.conn.execute(
+                "SELECT url FROM frontier WHERE brand = ? AND page = ? ORDER BY position", (brand_slug, page)
+            ).fetchall()
+        return [url for url, in rows]
+
+    def add_listing_page(self, brand_slug: str, page: int, product_urls: List[str]):
+        """Journal a parsed listing page and add its product URLs to the frontier."""
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO listing_pages VALUES (?, ?)", (brand_slug, page))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, brand, page, position) VALUES (?, ?, ?, ?)",
+                [(url, brand_slug, page, position) for position, url in enumerate(product_urls)]
+            )
+
+    def completed_product(self, product_url: str) -> Optional[Dict]:
+        """Return the product journaled for a URL that was already completed."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT product FROM frontier WHERE url = ? AND status = 'done'", (product_url,)
+            ).fetchone()
+        return compact(json.loads(row[0])) if row else None
+
+    def complete(self, product_url: str, product: Optional[Dict]):
+        """Journal the outcome of a product page; failed pages are retried on resume."""
+        status = 'done' if product else 'failed'
+        data = json.dumps(product, ensure_ascii=False, default=json_default) if product else None
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE frontier SET status = ?, product = ? WHERE url = ?", (status, data, product_url))
+
+    def visited_paths(self) -> List[str]:
+        """Return the paths of every URL in the frontier, to seed the scraper's visited set."""
+        with self.lock:
+            rows = self.conn.execute("SELECT url FROM frontier").fetchall()
+        return [urlparse(url).path for url, in rows]
+
+    def progress(self) -> Dict[str, int]:
+        """Count frontier URLs by status."""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def discard(self):
+        """Close and delete the journal once the crawl has finished."""
+        self.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
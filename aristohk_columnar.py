@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Columnar export of scraped products to Parquet or Arrow (IPC file / Feather v2).
+
+Products are written with typed columns instead of JSON text:
+
+    brand, condition, completeness,
+    scraped_from, product_type           dictionary-encoded strings (categorical in pandas)
+    reference, description, product_url strings
+    price_hkd, price_usd, price_idr      nullable int64
+    year                                 nullable int16
+    scraped_at, created                  timestamp[ms]
+
+With partitioning (the default) rows are grouped by brand and every Parquet
+row group / Arrow record batch holds a single brand, so a reader filtering on
+brand only decodes that brand's rows:
+
+    pyarrow.parquet.read_table('watches.parquet', filters=[('brand', '=', 'ROLEX')])
+    pandas.read_parquet('watches.parquet', filters=[('brand', '=', 'ROLEX')])
+
+ColumnarWriter is a ProductSink (see aristohk_output) like JsonLinesWriter, so
+the scraper can stream into it with --format parquet or --format arrow. A
+brand's rows are buffered until `row_group_rows` have accumulated or the file
+is closed. Existing JSON or JSON Lines snapshots are converted with:
+
+    python aristohk_columnar.py response.json --output response.parquet
+    python aristohk_columnar.py watches.jsonl --output watches.arrow --format arrow
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+from aristohk_output import load_products
+from aristohk_record import PRODUCT_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Only required for Parquet/Arrow output
+    pa = None
+
+COLUMNAR_FORMATS = ['parquet', 'arrow']
+DEFAULT_ROW_GROUP_ROWS = 100_000
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+PARTITION_KEY = b'aristohk.partition'
+
+CATEGORICAL_FIELDS = ('brand', 'condition', 'completeness', 'scraped_from', 'product_type')
+INTEGER_FIELDS = ('price_usd', 'price_idr', 'price_hkd')
+TIMESTAMP_FIELDS = ('scraped_at', 'created')
+
+
+def check_columnar(fmt: str):
+    """Raise if a columnar format is unknown or pyarrow is not installed."""
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{fmt}' (choose from {', '.join(COLUMNAR_FORMATS)})")
+    if pa is None:
+        raise ImportError(f"The {fmt} format requires pyarrow (pip install pyarrow)")
+
+
+def product_schema(partition: bool = False) -> 'pa.Schema':
+    """The Arrow schema of a product table, columns in the JSON field order; marked if grouped by brand."""
+    def field_type(name: str) -> 'pa.DataType':
+        if name in CATEGORICAL_FIELDS:
+            return pa.dictionary(pa.int32(), pa.string())
+        if name in INTEGER_FIELDS:
+            return pa.int64()
+        if name == 'year':
+            return pa.int16()
+        if name in TIMESTAMP_FIELDS:
+            return pa.timestamp('ms')
+        return pa.string()
+
+    metadata = {PARTITION_KEY: b'brand'} if partition else None
+    return pa.schema([pa.field(name, field_type(name)) for name in PRODUCT_FIELDS], metadata=metadata)
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def products_to_table(products: Sequence[Mapping], schema: 'pa.Schema' = None) -> 'pa.Table':
+    """Build a typed Arrow table from product dicts or records."""
+    columns = {}
+    for name in PRODUCT_FIELDS:
+        values = [product.get(name) for product in products]
+        if name in TIMESTAMP_FIELDS:
+            values = [_timestamp(value) for value in values]
+        columns[name] = values
+    return pa.Table.from_pydict(columns, schema=schema or product_schema())
+
+
+def table_to_products(table: 'pa.Table') -> Iterator[Dict]:
+    """Turn a product table back into dicts of the scraper's JSON shape."""
+    for row in table.to_pylist():
+        for name in TIMESTAMP_FIELDS:
+            if row.get(name) is not None:
+                row[name] = row[name].strftime(TIMESTAMP_FORMAT)[:-3]
+        yield row
+
+
+def _brand_filter(table: 'pa.Table', brands: Sequence[str]) -> 'pa.Table':
+    return table.filter(pc.is_in(table.column('brand').cast(pa.string()), value_set=pa.array(list(brands))))
+
+
+def load_table(filename: str, brands: Sequence[str] = None, columns: Sequence[str] = None) -> 'pa.Table':
+    """Read a Parquet or Arrow product file, optionally only some brands and columns.
+
+    Row groups (record batches) that cannot hold the brands are skipped without being decoded.
+    """
+    check_columnar('parquet')
+    read_columns = list(columns) if columns else None
+    if brands and read_columns and 'brand' not in read_columns:
+        read_columns.append('brand')
+
+    with open(filename, 'rb') as f:
+        magic = f.read(4)
+    if magic == b'PAR1':
+        parquet = pq.ParquetFile(filename)
+        groups = range(parquet.num_row_groups)
+        if brands:
+            index = parquet.schema_arrow.get_field_index('brand')
+
+            def may_hold(group: int) -> bool:
+                stats = parquet.metadata.row_group(group).column(index).statistics
+                return stats is None or not stats.has_min_max or any(stats.min <= b <= stats.max for b in brands)
+
+            groups = [group for group in groups if may_hold(group)]
+        table = parquet.read_row_groups(groups, columns=read_columns)
+    else:
+        with pa.memory_map(filename) as source:
+            reader = pa.ipc.open_file(source)
+            partitioned = (reader.schema.metadata or {}).get(PARTITION_KEY) == b'brand'
+            batches = []
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                if brands and partitioned and batch.num_rows and batch.column('brand')[0].as_py() not in brands:
+                    continue
+                batches.append(batch)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+        if read_columns:
+            table = table.select(read_columns)
+
+    if brands:
+        table = _brand_filter(table, brands)
+    return table.select(list(columns)) if columns else table
+
+
+class ColumnarWriter:
+    """Write products to a Parquet or Arrow file, one row group per brand when partitioning."""
+
+    def __init__(self, filename: str, fmt: str = 'parquet', partition: bool = True,
+                 row_group_rows: int = DEFAULT_ROW_GROUP_ROWS):
+        check_columnar(fmt)
+        self.filename = filename
+        self.fmt = fmt
+        self.partition = partition
+        self.row_group_rows = max(1, row_group_rows)
+        self.schema = product_schema(partition)
+        self.writer = None
+        self.count = 0
+        self.row_groups = 0
+        # Buffered products per brand (a single None key without partitioning), in order of first appearance
+        self.pending: Dict[Optional[str], List[Mapping]] = {}
+        self.tables: List['pa.Table'] = []
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def write(self, product: Mapping):
+        """Buffer one product, writing its brand's rows out once a row group is full."""
+        key = product.get('brand') if self.partition else None
+        with self.lock:
+            rows = self.pending.setdefault(key, [])
+            rows.append(product)
+            self.count += 1
+            if len(rows) >= self.row_group_rows:
+                self._flush(key)
+
+    def _flush(self, key: Optional[str]):
+        rows = self.pending.pop(key)
+        table = products_to_table(rows, self.schema)
+        self.row_groups += 1
+        if self.fmt == 'arrow':
+            # An Arrow file has one dictionary per column, so batches are kept (columnar) until close()
+            self.tables.append(table)
+            return
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.filename, self.schema)
+        self.writer.write_table(table, row_group_size=len(rows))
+
+    def close(self):
+        """Write the remaining buffered rows and finish the file."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            for key in list(self.pending):
+                self._flush(key)
+            if self.fmt == 'arrow':
+                table = (pa.concat_tables(self.tables).unify_dictionaries() if self.tables
+                         else products_to_table([], self.schema))
+                with pa.ipc.new_file(self.filename, self.schema) as writer:
+                    # One record batch per flushed group
+                    for batch in table.to_batches():
+                        writer.write_batch(batch)
+                self.tables = []
+            elif self.writer is None:
+                # No products: still leave a valid file with the schema
+                pq.write_table(products_to_table([], self.schema), self.filename)
+            else:
+                self.writer.close()
+                self.writer = None
+
+
+def convert(source: str, destination: str, fmt: str = 'parquet', partition: bool = True,
+            row_group_rows: int = DEFAULT_ROW_GROUP_ROWS) -> ColumnarWriter:
+    """Convert a JSON or JSON Lines product file to Parquet or Arrow."""
+    writer = ColumnarWriter(destination, fmt, partition, row_group_rows)
+    for product in load_products(source):
+        writer.write(product)
+    writer.close()
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a product JSON/JSON Lines file to Parquet or Arrow')
+    parser.add_argument('source', help='Products as a JSON array or JSON Lines file (e.g. response.json)')
+    parser.add_argument('--output', type=str, help='Output file (default: source with .parquet or .arrow)')
+    parser.add_argument('--format', choices=COLUMNAR_FORMATS, default='parquet', help='Columnar format')
+    parser.add_argument('--no-partition', action='store_true',
+                        help='Keep the input order instead of grouping rows by brand')
+    parser.add_argument('--row-group-rows', type=int, default=DEFAULT_ROW_GROUP_ROWS,
+                        help='Maximum rows per row group (record batch for arrow)')
+
+    args = parser.parse_args()
+    try:
+        check_columnar(args.format)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    output = args.output or f"{os.path.splitext(args.source)[0]}.{args.format}"
+    started = time.perf_counter()
+    writer = convert(args.source, output, args.format, not args.no_partition, args.row_group_rows)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {writer.count} products in {writer.row_groups} row groups to {output} "
+          f"({os.path.getsize(output) / 1024:.0f} KB, {os.path.getsize(args.source) / 1024:.0f} KB as JSON) "
+          f"in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Stored page corpus used by the offline tools (parser comparison, benchmarks).
+
+A corpus is a directory of HTML files plus an ``index.json`` listing the URL
+each file was fetched from:
+
+    [
+      {"url": "https://aristohk.com/rolex", "file": "0001.html"},
+      {"url": "https://aristohk.com/rolex/126500-ln-0002/18692", "file": "0002.html"}
+    ]
+"""
+
+import json
+import os
+import re
+from typing import Iterable, List, Tuple
+from urllib.parse import urlparse
+
+INDEX_FILE = 'index.json'
+
+
+def page_kind(url: str) -> str:
+    """Classify a page URL as 'home', 'listing' or 'detail'."""
+    path = urlparse(url).path.rstrip('/')
+    if not path:
+        return 'home'
+    if re.search(r'/\d+$', path):
+        return 'detail'
+    return 'listing'
+
+
+def load_corpus(directory: str) -> List[Tuple[str, bytes]]:
+    """Load every (url, html) pair of a corpus directory, in index order."""
+    with open(os.path.join(directory, INDEX_FILE), encoding='utf-8') as f:
+        index = json.load(f)
+
+    pages = []
+    for entry in index:
+        with open(os.path.join(directory, entry['file']), 'rb') as f:
+            pages.append((entry['url'], f.read()))
+    return pages
+
+
+def save_corpus(directory: str, pages: Iterable[Tuple[str, bytes]]) -> int:
+    """Append (url, html) pairs to a corpus directory, returning the number saved."""
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, INDEX_FILE)
+    index = []
+    if os.path.exists(index_path):
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+
+    saved = 0
+    for url, content in pages:
+        filename = f"{len(index) + 1:05d}.html"
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(content)
+        index.append({'url': url, 'file': filename})
+        saved += 1
+
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    return saved
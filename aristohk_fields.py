@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Single-pass field scanner for aristohk product pages.
+
+Price, condition, year and completeness used to be found by running a dozen
+separate case-insensitive regexes over the whole page text. FieldScanner
+instead locates each keyword anchor (HK$, Ask Price, Release Year, With Box,
+Pre-owned, ...) once with plain substring search over a case-folded copy of
+the text, then matches the original patterns only at those positions. The
+precedence rules and results are the same as the full-text sweeps.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Price and condition are only looked for in the main product area at the top of the page
+MAIN_CONTENT_LENGTH = 1500
+
+# Characters re.IGNORECASE matches to ASCII letters that str.lower() does not fold to them.
+# Translating them first also keeps the folded text the same length as the original.
+_CASE_FOLD_EXTRAS_CHARS = 'İıſ'
+_CASE_FOLD_EXTRAS = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+
+_PRICE_NUMBER = re.compile(r'([\d,]+)')
+_FOUR_DIGITS = re.compile(r'\d{4}')
+
+# Structured "Release Year" field, strict spelling first
+_RELEASE_YEAR_PATTERNS = [
+    re.compile(r'Release Year[:\s]*(\d{4})', re.I),   # "Release Year: 2020" or "Release Year 2020"
+    re.compile(r'release\s*year[:\s]*(\d{4})', re.I),  # Optional or repeated whitespace
+]
+
+# Years mentioned in the description text, as (anchor keyword, pattern)
+_DESCRIPTION_YEAR_PATTERNS = [
+    ('released in', re.compile(r'released in (\d{4})', re.I)),      # "released in 2023"
+    ('introduced in', re.compile(r'introduced in (\d{4})', re.I)),  # "introduced in 2020"
+    ('launched in', re.compile(r'launched in (\d{4})', re.I)),      # "launched in 2021"
+]
+
+_THIS_MODEL_YEAR = re.compile(r'this model.*?(\d{4})', re.I)     # "This model, ... in 2020"
+
+_PRODUCTION_YEAR = re.compile(r'production[:\s]*(\d{4})', re.I)   # "production: 2018"
+_ORIGINAL_BOX = re.compile(r'Original.*box', re.I)
+_ORIGINAL_CERTIFICATE = re.compile(r'Original.*certificate', re.I)
+
+
+def _find_all(haystack: str, needle: str, end: int) -> List[int]:
+    """Return the start of every occurrence of needle that ends before `end`."""
+    positions = []
+    pos = haystack.find(needle, 0, end)
+    while pos != -1:
+        positions.append(pos)
+        pos = haystack.find(needle, pos + 1, end)
+    return positions
+
+
+class FieldScanner:
+    """Resolve product fields from keyword anchors found in a page's text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.main_content = text[:MAIN_CONTENT_LENGTH]
+        if any(char in text for char in _CASE_FOLD_EXTRAS_CHARS):
+            self.folded = text.translate(_CASE_FOLD_EXTRAS).lower()
+        else:
+            self.folded = text.lower()
+        self._hits: Dict[Tuple[str, bool], List[int]] = {}
+
+    def hits(self, keyword: str, main_only: bool = False) -> List[int]:
+        """Return every position where a lowercase keyword occurs, ignoring case."""
+        key = (keyword, main_only)
+        if key not in self._hits:
+            end = len(self.main_content) if main_only else len(self.folded)
+            self._hits[key] = _find_all(self.folded, keyword, end)
+        return self._hits[key]
+
+    def _contains(self, keyword: str, main_only: bool = False) -> bool:
+        end = len(self.main_content) if main_only else len(self.folded)
+        return self.folded.find(keyword, 0, end) != -1
+
+    def _first_match(self, keyword: str, pattern: 're.Pattern') -> Optional['re.Match']:
+        """Return the leftmost match of a pattern that starts with `keyword`."""
+        for pos in self.hits(keyword):
+            match = pattern.match(self.text, pos)
+            if match:
+                return match
+        return None
+
+    def _first_match_on_line(self, keyword: str, pattern: 're.Pattern') -> Optional['re.Match']:
+        """Like _first_match for patterns of the form keyword.*X, skipping hits on lines already ruled out.
+
+        '.' does not cross newlines, so once a hit fails every later hit on the same
+        line (which sees a shorter remainder of that line) fails too.
+        """
+        line_end = -1
+        for pos in self.hits(keyword):
+            if pos < line_end:
+                continue
+            match = pattern.match(self.text, pos)
+            if match:
+                return match
+            line_end = self.text.find('\n', pos)
+            if line_end == -1:
+                return None
+        return None
+
+    def _first_year_before(self, keyword: str) -> Optional[int]:
+        """Return the leftmost year written just before `keyword`, like r'(\\d{4})\\s*keyword'."""
+        for pos in self.hits(keyword):
+            start = pos
+            while start > 0 and self.text[start - 1].isspace():
+                start -= 1
+            if start >= 4 and _FOUR_DIGITS.fullmatch(self.text, start - 4, start):
+                return int(self.text[start - 4:start])
+        return None
+
+    def price(self) -> Optional[int]:
+        """Return the first substantial HK$ price in the main content, or None for "Ask Price"."""
+        main_content = self.main_content
+        ask_price_positions = self.hits('ask price', main_only=True)
+
+        for idx in _find_all(main_content, 'HK$', len(main_content)):
+            number_match = _PRICE_NUMBER.match(main_content, idx + 3, idx + 20)
+            if not number_match:
+                continue
+            try:
+                price_num = int(number_match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+
+            if price_num > 10000:  # Main product prices are usually substantial
+                # Skip prices with "Ask Price" in close proximity
+                low, high = max(0, idx - 50), min(idx + 100, len(main_content))
+                if not any(low <= pos and pos + len('ask price') <= high for pos in ask_price_positions):
+                    return price_num
+
+        return None
+
+    def condition(self) -> str:
+        """Return "New" or "Pre-owned" based on the main content."""
+        if self._contains('hot', main_only=True):
+            return "New"
+        if self._contains('pre-owned', main_only=True):
+            return "Pre-owned"
+        return "New"  # Default assumption
+
+    def year(self) -> Optional[int]:
+        """Return the release year, preferring the structured field over description text."""
+        # Method 1: structured "Release Year" field (most accurate)
+        for pattern in _RELEASE_YEAR_PATTERNS:
+            match = self._first_match('release', pattern)
+            if match and 1950 <= int(match.group(1)) <= 2027:
+                return int(match.group(1))
+
+        # Method 2: years mentioned in the description text
+        for keyword, pattern in _DESCRIPTION_YEAR_PATTERNS:
+            match = self._first_match(keyword, pattern)
+            if match and 1950 <= int(match.group(1)) <= 2027:
+                return int(match.group(1))
+
+        match = self._first_match_on_line('this model', _THIS_MODEL_YEAR)
+        if match and 1950 <= int(match.group(1)) <= 2027:
+            return int(match.group(1))
+
+        # Method 3: years in specific contexts, avoiding current/future years
+        # which are likely copyright notices
+        for keyword in ('model', 'edition'):                 # "2020 model", "2019 edition"
+            year = self._first_year_before(keyword)
+            if year is not None and 1950 <= year <= 2024:
+                return year
+
+        match = self._first_match('production', _PRODUCTION_YEAR)
+        if match and 1950 <= int(match.group(1)) <= 2024:
+            return int(match.group(1))
+
+        # Better to leave the year empty than to guess wrong
+        return None
+
+    def completeness(self) -> str:
+        """Return the accessories included, e.g. "With Box, With Papers"."""
+        completeness_parts = []
+
+        if self._contains('with box'):
+            completeness_parts.append("With Box")
+
+        if self._contains('with paper'):
+            completeness_parts.append("With Papers")
+
+        # "Original ... box" / "Original ... certificate" on the same line
+        if "With Box" not in completeness_parts and self._first_match_on_line('original', _ORIGINAL_BOX):
+            completeness_parts.append("With Box")
+
+        if "With Papers" not in completeness_parts and self._first_match_on_line('original', _ORIGINAL_CERTIFICATE):
+            completeness_parts.append("With Papers")
+
+        return ", ".join(completeness_parts)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for the aristohk scraper.
+
+Extraction only needs a handful of queries on a page (links, visible text,
+the text of the first <title>/<h1>, pagination markers), so each backend is
+wrapped in a small document class exposing just those:
+
+    html.parser  - BeautifulSoup with the standard library parser (default)
+    lxml         - BeautifulSoup with the lxml parser
+    selectolax   - the lexbor engine directly, mimicking BeautifulSoup's
+                   get_text() rules so extraction results stay identical
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Only required by the selectolax backend
+    LexborHTMLParser = None
+
+PARSER_BACKENDS = ['html.parser', 'lxml', 'selectolax']
+
+
+class HtmlDocument(ABC):
+    """Backend-neutral view of a parsed page."""
+
+    @abstractmethod
+    def links(self) -> List[str]:
+        """Return the href of every <a> tag that has one, in document order."""
+
+    @abstractmethod
+    def text(self) -> str:
+        """Return the visible text of the whole page, like BeautifulSoup's get_text()."""
+
+    @abstractmethod
+    def first_text(self, tag: str) -> Optional[str]:
+        """Return the text of the first `tag` element, or None if there is none."""
+
+    @abstractmethod
+    def has_element(self, tag: str, class_name: str) -> bool:
+        """Check whether a `tag` element with the given class exists."""
+
+    @abstractmethod
+    def strings(self) -> List[str]:
+        """Return every string in the page, including script and comment contents."""
+
+
+class SoupDocument(HtmlDocument):
+    """Document backed by a BeautifulSoup tree (html.parser or lxml)."""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+
+    def links(self) -> List[str]:
+        return [link.get('href') for link in self.soup.find_all('a', href=True)]
+
+    def text(self) -> str:
+        return self.soup.get_text()
+
+    def first_text(self, tag: str) -> Optional[str]:
+        element = self.soup.find(tag)
+        return element.get_text() if element is not None else None
+
+    def has_element(self, tag: str, class_name: str) -> bool:
+        return self.soup.find(tag, class_=class_name) is not None
+
+    def strings(self) -> List[str]:
+        return [str(string) for string in self.soup.find_all(string=True)]
+
+
+class SelectolaxDocument(HtmlDocument):
+    """Document backed by a selectolax (lexbor) tree."""
+
+    # BeautifulSoup leaves the contents of these tags out of get_text()
+    HIDDEN_TEXT_PARENTS = {'script', 'style', 'template', 'rt', 'rp'}
+
+    def __init__(self, tree: 'LexborHTMLParser'):
+        self.tree = tree
+
+    def _text_of(self, node) -> str:
+        """Concatenate the visible text nodes below a node."""
+        return ''.join(
+            child.text_content for child in node.traverse(include_text=True)
+            if child.tag == '-text' and child.parent.tag not in self.HIDDEN_TEXT_PARENTS
+        )
+
+    def links(self) -> List[str]:
+        return [link.attributes.get('href') or '' for link in self.tree.css('a[href]')]
+
+    def text(self) -> str:
+        return self._text_of(self.tree.root) if self.tree.root is not None else ''
+
+    def first_text(self, tag: str) -> Optional[str]:
+        element = self.tree.css_first(tag)
+        return self._text_of(element) if element is not None else None
+
+    def has_element(self, tag: str, class_name: str) -> bool:
+        return self.tree.css_first(f"{tag}.{class_name}") is not None
+
+    def strings(self) -> List[str]:
+        if self.tree.root is None:
+            return []
+        strings = []
+        for node in self.tree.root.traverse(include_text=True):
+            if node.tag == '-text':
+                strings.append(node.text_content)
+            elif node.tag == '-comment' and node.comment_content is not None:
+                strings.append(node.comment_content)
+        return strings
+
+
+def check_parser_backend(backend: str):
+    """Raise early if a parser backend is unknown or its library is missing."""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+    if backend == 'selectolax' and LexborHTMLParser is None:
+        raise ImportError("The selectolax parser backend requires selectolax (pip install selectolax)")
+    if backend == 'lxml':
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise ImportError("The lxml parser backend requires lxml (pip install lxml)")
+
+
+def parse_document(content: bytes, backend: str = 'html.parser') -> HtmlDocument:
+    """Parse a raw page body with the given backend."""
+    if backend == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ImportError("The selectolax parser backend requires selectolax (pip install selectolax)")
+        return SelectolaxDocument(LexborHTMLParser(content))
+    if backend in ('html.parser', 'lxml'):
+        return SoupDocument(BeautifulSoup(content, backend))
+    raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
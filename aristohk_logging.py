@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Logging setup for the aristohk scraper.
+
+Importing the scraper modules configures nothing; scripts call
+configure_logging() once. Log calls then only put the record on a queue, and
+a background QueueListener thread formats it and writes it to the console
+and the log file, so fetch and extract threads never wait on disk or
+terminal I/O.
+
+Per-URL messages (fetched, cached, not modified) are logged with the URL in
+the record's `url` attribute. Their volume grows with the crawl, so they can
+be sampled: with url_sample_rate=0.1 about one URL in ten is logged, chosen
+by a hash of the URL so all messages about a URL are kept or dropped
+together. Warnings and errors are always logged.
+
+With json_format=True every line is a JSON object (time, level, logger,
+message, plus url when present) for log shippers.
+
+Worker processes (--parse-workers) send their records to the parent through
+a multiprocessing queue; pass init_worker_logging and worker_logging_args()
+as the pool's initializer.
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import queue
+import zlib
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_LOG_FILE = 'scraper.log'
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_worker_listener: Optional[QueueListener] = None
+_url_sample_rate = 1.0
+
+
+class UrlSampler(logging.Filter):
+    """Keep a stable fraction of the per-URL records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(max(0.0, min(1.0, rate)) * 0xFFFFFFFF)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        url = getattr(record, 'url', None)
+        if url is None or record.levelno >= logging.WARNING:
+            return True
+        return zlib.crc32(url.encode()) <= self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'url', None) is not None:
+            entry['url'] = record.url
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level: str = 'INFO', log_file: Optional[str] = DEFAULT_LOG_FILE, console: bool = True,
+                      json_format: bool = False, url_sample_rate: float = 1.0) -> QueueListener:
+    """Route the root logger through a queue to console and/or file handlers on a background thread.
+
+    Calling it again replaces the previous configuration.
+    """
+    global _listener, _queue_handler, _url_sample_rate
+    shutdown_logging()
+    _url_sample_rate = url_sample_rate
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    if url_sample_rate < 1.0:
+        _queue_handler.addFilter(UrlSampler(url_sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def worker_logging_args() -> Tuple:
+    """Initializer arguments for worker processes: a queue read by the parent, the level and sample rate."""
+    global _worker_listener
+    level = logging.getLogger().level
+    if not _listener:
+        return None, level, 1.0
+    if not _worker_listener:
+        _worker_listener = QueueListener(multiprocessing.Queue(), *_listener.handlers, respect_handler_level=True)
+        _worker_listener.start()
+    return _worker_listener.queue, level, _url_sample_rate
+
+
+def init_worker_logging(log_queue, level: int, url_sample_rate: float):
+    """Send a worker process's records to the parent instead of handlers inherited on fork."""
+    if log_queue is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = QueueHandler(log_queue)
+    if url_sample_rate < 1.0:
+        handler.addFilter(UrlSampler(url_sample_rate))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writers."""
+    global _listener, _queue_handler, _worker_listener
+    if _queue_handler:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _worker_listener:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
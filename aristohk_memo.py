@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+In-process page memo for the aristohk scraper.
+
+Within one run a few pages are asked for more than once: a brand's first
+listing page is fetched to count its pages and again for its products, and
+calling scrape_all once per brand re-reads the homepage every time.
+PageMemo keeps the most recently parsed pages, keyed by canonical URL, and
+coalesces identical requests that are still in flight, so each page is
+fetched and parsed once. Failed loads are not remembered.
+
+The scraper only passes those pages (the homepage and page 1 of each brand)
+through the memo; later listing pages are read once and fetched directly, so
+they neither take memory nor evict the pages that are reused.
+
+Threads wait on the in-flight load with a concurrent.futures.Future; asyncio
+tasks await the same future through asyncio.wrap_future.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from aristohk_urls import canonical_url
+
+DEFAULT_MAX_PAGES = 16
+
+
+class PageMemo:
+    """Bounded LRU memo of parsed pages that also dedupes in-flight requests."""
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES):
+        self.max_pages = max(0, max_pages)
+        self.hits = 0
+        self.misses = 0
+        self._pages: 'OrderedDict[str, object]' = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        """Return the future holding a page, and whether the caller has to load it."""
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(self._pages[key])
+                return future, False
+            if key in self._pending:
+                self.hits += 1
+                return self._pending[key], False
+            self.misses += 1
+            future = self._pending[key] = Future()
+            return future, True
+
+    def _settle(self, key: str, future: Future, value: Optional[object]):
+        with self._lock:
+            del self._pending[key]
+            if value is not None and self.max_pages:
+                self._pages[key] = value
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        future.set_result(value)
+
+    def _abort(self, key: str, future: Future, error: BaseException):
+        with self._lock:
+            del self._pending[key]
+        future.set_exception(error)
+
+    def get(self, url: str, load: Callable[[], Optional[object]]) -> Optional[object]:
+        """Return the page for a URL, calling `load` only if no one has it or is loading it."""
+        key = canonical_url(url)
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+
+        try:
+            value = load()
+        except BaseException as e:
+            self._abort(key, future, e)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    async def get_async(self, url: str, load: Callable[[], Awaitable[Optional[object]]]) -> Optional[object]:
+        """Like get, awaiting `load` and any identical request already in flight."""
+        key = canonical_url(url)
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = await load()
+        except BaseException as e:
+            self._abort(key, future, e)
+            raise
+        self._settle(key, future, value)
+        return value
+
+    def clear(self):
+        """Forget every remembered page."""
+        with self._lock:
+            self._pages.clear()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Per-stage crawl metrics for the aristohk scraper.
+
+CrawlMetrics collects, thread-safely:
+
+    aristohk_requests_total{status}       HTTP responses by status code ("error" when none came back)
+    aristohk_cache_hits_total             pages served from the on-disk cache without a request
+    aristohk_retries_total                fetch attempts after the first
+    aristohk_fetch_failures_total         pages given up on after all retries
+    aristohk_circuit_opens_total{scope}   circuit breakers opened, by scope (host or brand)
+    aristohk_short_circuits_total{scope}  requests failed fast by an open circuit breaker
+    aristohk_response_bytes_total         body bytes received, after decoding
+    aristohk_wire_bytes_total             body bytes transferred, before decoding (compressed size)
+    aristohk_stage_seconds{stage}         latency histogram of fetch, parse, extract, pool and write
+    aristohk_products_total{brand}        products recorded per brand
+    aristohk_crawl_duration_seconds       time since the metrics were created
+    aristohk_products_per_second          products recorded per second of crawl
+    aristohk_request_error_ratio          share of requests that errored, were throttled or hit a 5xx
+    aristohk_request_rate{host}           current request rate of the --adaptive rate controller
+
+and exports them in the Prometheus text exposition format (e.g. for the node
+exporter's textfile collector) or as a JSON summary. The "pool" stage is the
+round trip of a page through the --parse-workers process pool, whose parse
+and extract happen in another process.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Upper bounds in seconds, Prometheus style
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            pairs.append((str(bound), total))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket, like Prometheus' histogram_quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower, previous = 0.0, 0
+        for bound, (_, total) in zip(self.buckets, self.cumulative()):
+            if total >= rank:
+                in_bucket = total - previous
+                value = lower + (bound - lower) * (rank - previous) / in_bucket if in_bucket else bound
+                return min(value, self.max)
+            lower, previous = bound, total
+        return self.max
+
+
+class StageTimer:
+    """Context manager recording the duration of one stage."""
+
+    def __init__(self, metrics: 'CrawlMetrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class CrawlMetrics:
+    """Counters and stage latency histograms for one crawl."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.products = Counter()
+        self.cache_hits = 0
+        self.retries = 0
+        self.fetch_failures = 0
+        self.circuit_opens = Counter()
+        self.short_circuits = Counter()
+        self.response_bytes = 0
+        self.wire_bytes = 0
+        self.stages: Dict[str, Histogram] = {}
+        self.request_rates: Dict[str, float] = {}
+
+    def time(self, stage: str) -> StageTimer:
+        """Time a block as one observation of `stage`."""
+        return StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    def record_response(self, status, size: int = 0, wire_size: int = None):
+        """Count a response by status code ("error" if the request failed without one).
+
+        `size` is the decoded body size and `wire_size` what was transferred, if known and different.
+        """
+        with self.lock:
+            self.requests[str(status)] += 1
+            self.response_bytes += size
+            self.wire_bytes += size if wire_size is None else wire_size
+
+    def record_response_bytes(self, size: int, wire_size: int = None):
+        """Count body bytes of a response that is read incrementally."""
+        with self.lock:
+            self.response_bytes += size
+            self.wire_bytes += size if wire_size is None else wire_size
+
+    def set_request_rate(self, host: str, rate: float):
+        with self.lock:
+            self.request_rates[host] = rate
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def record_failure(self):
+        with self.lock:
+            self.fetch_failures += 1
+
+    def record_circuit_open(self, scope: str):
+        with self.lock:
+            self.circuit_opens[scope] += 1
+
+    def record_short_circuit(self, scope: str):
+        with self.lock:
+            self.short_circuits[scope] += 1
+
+    def record_cache_hit(self):
+        with self.lock:
+            self.cache_hits += 1
+
+    def record_product(self, brand: str):
+        with self.lock:
+            self.products[brand] += 1
+
+    def _rates(self) -> Tuple[float, float, float]:
+        """Return crawl duration, products per second and the share of failed requests."""
+        duration = time.time() - self.started
+        products = sum(self.products.values())
+        requests = sum(self.requests.values())
+        failed = sum(count for status, count in self.requests.items()
+                     if status == 'error' or status == '429' or status.startswith('5'))
+        return (duration, products / duration if duration > 0 else 0.0,
+                failed / requests if requests else 0.0)
+
+    def to_dict(self) -> Dict:
+        """Summarize the metrics as a JSON-serializable dict."""
+        with self.lock:
+            duration, products_per_second, error_rate = self._rates()
+            return {
+                'duration_seconds': round(duration, 3),
+                'products': sum(self.products.values()),
+                'products_per_second': round(products_per_second, 3),
+                'products_per_brand': dict(self.products),
+                'requests': sum(self.requests.values()),
+                'requests_by_status': dict(self.requests),
+                'error_rate': round(error_rate, 4),
+                'cache_hits': self.cache_hits,
+                'retries': self.retries,
+                'fetch_failures': self.fetch_failures,
+                'circuit_opens': dict(self.circuit_opens),
+                'short_circuits': dict(self.short_circuits),
+                'request_rates': {host: round(rate, 3) for host, rate in self.request_rates.items()},
+                'response_bytes': self.response_bytes,
+                'wire_bytes': self.wire_bytes,
+                'compression_ratio': round(self.response_bytes / self.wire_bytes, 2) if self.wire_bytes else 0.0,
+                'stages': {
+                    stage: {
+                        'count': histogram.count,
+                        'total_seconds': round(histogram.sum, 6),
+                        'mean_ms': round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0,
+                        'p50_ms': round(histogram.quantile(0.5) * 1000, 3),
+                        'p95_ms': round(histogram.quantile(0.95) * 1000, 3),
+                        'max_ms': round(histogram.max * 1000, 3),
+                    }
+                    for stage, histogram in self.stages.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            duration, products_per_second, error_rate = self._rates()
+
+            family('aristohk_requests_total', 'counter', 'HTTP responses by status code')
+            for status, count in sorted(self.requests.items()):
+                lines.append(f'aristohk_requests_total{{status="{status}"}} {count}')
+
+            for name, value, help_text in (
+                ('aristohk_cache_hits_total', self.cache_hits, 'Pages served from the cache without a request'),
+                ('aristohk_retries_total', self.retries, 'Fetch attempts after the first'),
+                ('aristohk_fetch_failures_total', self.fetch_failures, 'Pages given up on after all retries'),
+                ('aristohk_response_bytes_total', self.response_bytes, 'Response body bytes received, after decoding'),
+                ('aristohk_wire_bytes_total', self.wire_bytes, 'Response body bytes transferred, before decoding'),
+            ):
+                family(name, 'counter', help_text)
+                lines.append(f"{name} {value}")
+
+            for name, counter, help_text in (
+                ('aristohk_circuit_opens_total', self.circuit_opens, 'Circuit breakers opened, by scope'),
+                ('aristohk_short_circuits_total', self.short_circuits, 'Requests failed fast by an open circuit breaker'),
+            ):
+                if counter:
+                    family(name, 'counter', help_text)
+                    for scope, count in sorted(counter.items()):
+                        lines.append(f'{name}{{scope="{scope}"}} {count}')
+
+            family('aristohk_stage_seconds', 'histogram', 'Duration of crawl stages')
+            for stage, histogram in sorted(self.stages.items()):
+                for le, count in histogram.cumulative():
+                    lines.append(f'aristohk_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'aristohk_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'aristohk_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            family('aristohk_products_total', 'counter', 'Products recorded per brand')
+            for brand, count in sorted(self.products.items()):
+                label = brand.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'aristohk_products_total{{brand="{label}"}} {count}')
+
+            for name, value, help_text in (
+                ('aristohk_crawl_duration_seconds', duration, 'Seconds since the crawl started'),
+                ('aristohk_products_per_second', products_per_second, 'Products recorded per second of crawl'),
+                ('aristohk_request_error_ratio', error_rate, 'Share of requests that failed, were throttled or hit a 5xx'),
+            ):
+                family(name, 'gauge', help_text)
+                lines.append(f"{name} {value:.6f}")
+
+            if self.request_rates:
+                family('aristohk_request_rate', 'gauge', 'Current adaptive request rate per host (requests/second)')
+                for host, rate in sorted(self.request_rates.items()):
+                    lines.append(f'aristohk_request_rate{{host="{host}"}} {rate:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary_line(self) -> str:
+        """One log line with the headline numbers."""
+        summary = self.to_dict()
+        stages = ', '.join(f"{stage} {stats['mean_ms']}ms" for stage, stats in summary['stages'].items())
+        rates = ''.join(f", rate {host} {rate}/s" for host, rate in summary['request_rates'].items())
+        short_circuits = sum(summary['short_circuits'].values())
+        failed_fast = f", {short_circuits} failed fast" if short_circuits else ''
+        return (f"{summary['products']} products in {summary['duration_seconds']}s "
+                f"({summary['products_per_second']}/s), {summary['requests']} requests, "
+                f"error rate {summary['error_rate']:.1%}, {summary['retries']} retries{failed_fast}{rates}; mean {stages}")
+
+    def write_json(self, filename: str):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def write_prometheus(self, filename: str):
+        """Write the text format atomically, so a collector never reads a partial file."""
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, filename)
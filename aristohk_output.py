@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Output formats for scraped products.
+
+    json   - one pretty-printed JSON array written at the end of the run (default)
+    jsonl  - JSON Lines, one product per line, written and flushed as soon as
+             each product is extracted (use "-" for stdout)
+
+A JSON Lines file can be turned into the pretty JSON array afterwards with
+jsonl_to_json, without loading the whole file into memory.
+
+The scraper streams into any ProductSink: JsonLinesWriter here, or
+aristohk_columnar.ColumnarWriter for Parquet and Arrow.
+"""
+
+import json
+import sys
+import threading
+from typing import Dict, Iterator, Mapping, Protocol
+
+from aristohk_record import json_default
+
+OUTPUT_FORMATS = ['json', 'jsonl']
+
+
+class ProductSink(Protocol):
+    """A writer products are streamed into as they are extracted."""
+
+    def write(self, product: Mapping):
+        """Write (or buffer) one product; called from several threads."""
+
+    def close(self):
+        """Finish the output; safe to call more than once."""
+
+
+class JsonLinesWriter:
+    """Write products to a JSON Lines file or stdout, flushing after each one."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = sys.stdout if filename == '-' else open(filename, 'w', encoding='utf-8')
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def write(self, product: Dict):
+        """Write one product and flush it so readers see it immediately."""
+        line = json.dumps(product, ensure_ascii=False, default=json_default)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+            self.count += 1
+
+    def close(self):
+        """Close the output file (stdout is left open)."""
+        if self.file is not sys.stdout and not self.file.closed:
+            self.file.close()
+
+
+def load_products(filename: str) -> Iterator[Dict]:
+    """Read products from a JSON array or JSON Lines file."""
+    with open(filename, encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == '[':
+            yield from json.load(f)
+            return
+
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def jsonl_to_json(source: str, destination: str) -> int:
+    """Convert a JSON Lines file to the pretty JSON array save_to_json writes, one product at a time."""
+    count = 0
+    with open(destination, 'w', encoding='utf-8') as out:
+        for product in load_products(source):
+            # Same layout as json.dump(products, f, indent=2, ensure_ascii=False)
+            item = json.dumps(product, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            out.write(('[\n  ' if count == 0 else ',\n  ') + item)
+            count += 1
+        out.write('\n]' if count else '[]')
+    return count
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Process pool for the CPU-bound product extraction stage.
+
+HTML parsing and field extraction hold the GIL, so with concurrent fetching a
+single core becomes the bottleneck. ParsePool runs a pure extraction function
+of (url, html) in child processes while the fetch stage keeps downloading.
+
+The pool bounds the number of product pages in flight between the stages:
+a fetcher takes a slot before downloading a page and gives it back once the
+page has been extracted, so fetching pauses when the parse workers fall
+behind instead of piling up page bodies in memory.
+"""
+
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ParsePool:
+    """Run an extraction function in worker processes, with a cap on pages in flight."""
+
+    def __init__(self, workers: int, extract: Callable[[str, bytes], Optional[Dict]], max_pending: int = None,
+                 initializer: Callable = None, initargs: Tuple = ()):
+        self.workers = workers
+        self.extract = extract
+        self.max_pending = max_pending or 2 * workers
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+
+    def submit(self, url: str, content: bytes) -> Future:
+        """Queue a fetched page for extraction in a worker process."""
+        return self.executor.submit(self.extract, url, content)
+
+    def shutdown(self):
+        """Stop the worker processes, dropping pages that were not extracted yet."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
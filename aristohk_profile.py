@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Profiling support for crawl runs (--profile).
+
+Two modes:
+
+    cprofile  deterministic profile of the main thread with cProfile, written
+              as a pstats file (open with `python -m pstats` or snakeviz).
+              Covers the sync engine without --workers and the async engine.
+    sample    a background thread samples the stacks of every thread every
+              few milliseconds and writes them in the collapsed-stack format
+              flamegraph tools read. Its overhead is small and independent
+              of how many calls the crawl makes, so it can stay enabled for a
+              fraction of production runs (--profile-rate).
+
+Either way a summary of time per crawl stage, with the top functions in each,
+is written next to the profile as <profile>.txt. Stages are recognised by
+their entry points: fetching pages, HTML parsing (BeautifulSoup or
+selectolax construction), page text (get_text), the keyword/regex field
+scanner, the rest of product extraction, and listing page parsing.
+Extraction in --parse-workers processes is not covered.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+
+PROFILE_MODES = ['cprofile', 'sample']
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 8
+
+# (stage, module file, function names); an empty set matches every function of the module
+STAGE_ENTRY_POINTS = [
+    ('fetch', 'aristohk_scraper.py', {'fetch_content', 'fetch_content_async', 'probe_brand', 'probe_brand_async',
+                                      'read_sitemap'}),
+    ('parse', 'aristohk_html.py', {'parse_document'}),
+    ('text', 'aristohk_html.py', {'text', 'first_text', '_text_of'}),
+    ('fields', 'aristohk_fields.py', set()),
+    ('extract', 'aristohk_scraper.py', {'parse_product_details', 'parse_product_brand', 'parse_product_reference'}),
+    ('listing', 'aristohk_scraper.py', {'parse_product_urls', 'parse_total_pages', 'parse_brands'}),
+]
+STAGES = [stage for stage, _, _ in STAGE_ENTRY_POINTS] + ['other']
+
+# Leaf frames of threads parked with nothing to do (idle pool workers, the event loop, joins)
+IDLE_FRAMES = {('threading.py', 'wait'), ('thread.py', '_worker'), ('selectors.py', 'select'),
+               ('queue.py', 'get'), ('socketserver.py', 'serve_forever')}
+
+
+def stage_of(filename: str, function: str) -> Optional[str]:
+    """Return the stage a function is the entry point of, if any."""
+    base = os.path.basename(filename)
+    for stage, module, functions in STAGE_ENTRY_POINTS:
+        if base == module and (not functions or function in functions):
+            return stage
+    return None
+
+
+def _label(filename: str, line: int, function: str) -> str:
+    return f"{function} ({os.path.basename(filename)}:{line})" if line else f"{function} ({filename})"
+
+
+def _format_summary(title: str, unit: str, totals: Dict[str, float],
+                    top: Dict[str, Counter], overall: float) -> str:
+    lines = [title, '-' * 72]
+    for stage in STAGES:
+        if not totals.get(stage):
+            continue
+        share = totals[stage] / overall * 100 if overall else 0.0
+        lines.append(f"{stage:<10}{totals[stage]:>12.3f} {unit:<8}{share:>6.1f}%")
+        for label, value in top[stage].most_common(TOP_FUNCTIONS):
+            lines.append(f"    {value:>10.3f}  {label}")
+    return '\n'.join(lines) + '\n'
+
+
+class CallProfile:
+    """cProfile of the main thread, summarized per stage."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, filename: str):
+        self.profiler.dump_stats(filename)
+
+    def summary(self) -> str:
+        """Attribute every function's own time to the nearest stage entry point among its callers."""
+        stats = pstats.Stats(self.profiler).stats
+        stage_cache: Dict[Tuple, str] = {}
+
+        def nearest_stage(func: Tuple) -> str:
+            if func in stage_cache:
+                return stage_cache[func]
+            seen = {func}
+            queue = deque([func])
+            stage = 'other'
+            while queue:
+                current = queue.popleft()
+                found = stage_of(current[0], current[2])
+                if found:
+                    stage = found
+                    break
+                for caller in stats.get(current, (0, 0, 0, 0, {}))[4]:
+                    if caller not in seen:
+                        seen.add(caller)
+                        queue.append(caller)
+            stage_cache[func] = stage
+            return stage
+
+        totals = Counter()
+        top = {stage: Counter() for stage in STAGES}
+        for func, (_, _, own_time, _, callers) in stats.items():
+            # Split shared helpers (regex, builtins) by how much of their time each caller accounted for
+            if stage_of(func[0], func[2]) or not callers:
+                shares = [(nearest_stage(func), own_time)]
+            else:
+                shares = [(nearest_stage(caller), edge[2]) for caller, edge in callers.items()]
+            for stage, seconds in shares:
+                totals[stage] += seconds
+                top[stage][_label(*func)] += seconds
+        overall = sum(totals.values())
+        return _format_summary(f"Time by stage (cProfile, own time, {overall:.3f}s total)", 's', totals, top, overall)
+
+
+class SamplingProfile:
+    """Low-overhead stack sampler covering every thread."""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def save(self, filename: str):
+        """Write the samples in the collapsed-stack format (one 'a;b;c count' line per stack)."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(';'.join(_label(*func) for func in stack) + f" {count}\n")
+
+    def summary(self) -> str:
+        """Attribute each sample's leaf function to the innermost stage entry point on its stack.
+
+        Sampled time is wall-clock time, so a thread blocked in a socket read counts towards its stage.
+        """
+        totals = Counter()
+        top = {stage: Counter() for stage in STAGES}
+        idle = 0
+        for stack, count in self.stacks.items():
+            if (os.path.basename(stack[-1][0]), stack[-1][2]) in IDLE_FRAMES:
+                idle += count
+                continue
+            stage = 'other'
+            for filename, _, function in reversed(stack):
+                found = stage_of(filename, function)
+                if found:
+                    stage = found
+                    break
+            totals[stage] += count * self.interval
+            top[stage][_label(*stack[-1])] += count * self.interval
+        overall = sum(totals.values())
+        return _format_summary(f"Time by stage (sampled every {self.interval * 1000:g} ms across threads, "
+                               f"{self.samples} samples, {idle} idle thread stacks left out)",
+                               's', totals, top, overall)
+
+
+def make_profile(mode: str, interval: float = DEFAULT_SAMPLE_INTERVAL):
+    """Create a profile for the given mode."""
+    if mode == 'sample':
+        return SamplingProfile(interval)
+    if mode == 'cprofile':
+        return CallProfile()
+    raise ValueError(f"Unknown profile mode '{mode}' (choose from {', '.join(PROFILE_MODES)})")
+
+
+def write_profile(profile, filename: str) -> str:
+    """Write a finished profile and its stage summary; returns the summary."""
+    profile.save(filename)
+    summary = profile.summary()
+    with open(f"{filename}.txt", 'w', encoding='utf-8') as f:
+        f.write(summary)
+    return summary
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Adaptive request rate control (AIMD) driven by the server's responses.
+
+An AimdController paces the requests to one host at its current rate and
+adjusts that rate from the responses:
+
+    - after `window` consecutive healthy responses (success or 404, answered
+      within `latency_target` seconds) the rate grows by `increase` req/s,
+      up to `max_rate` (additive increase)
+    - a throttling signal (429, 503, a timeout or a connection error) cuts
+      the rate by `decrease` (multiplicative decrease), down to `min_rate`;
+      requests already in flight when the cut happened cannot cut it again
+      right away
+    - slow responses and other server errors hold the rate where it is
+    - a Retry-After header pauses the host until the time it names
+
+so a crawl converges on the fastest rate the site sustains at the moment.
+"""
+
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RATE = 20.0
+MAX_RETRY_AFTER = 300.0
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds a Retry-After header asks to wait (delta-seconds or HTTP date), capped."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class AimdController:
+    """Thread-safe pacing of one host's requests at a rate adapted from its responses."""
+
+    def __init__(self, host: str, rate: float = 1.0, min_rate: float = 0.1, max_rate: float = DEFAULT_MAX_RATE,
+                 increase: float = 1.0, decrease: float = 0.5, window: int = 5, latency_target: float = 2.0):
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max(min_rate, max_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.latency_target = latency_target
+        self.healthy_streak = 0
+        self.next_slot = time.monotonic()
+        self.paused_until = 0.0
+        self.last_cut = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next request slot, returning how long to wait before sending."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot, self.paused_until)
+            self.next_slot = slot + 1 / self.rate
+            return slot - now
+
+    def acquire(self):
+        """Block until the next request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, status: Optional[int], latency: float = None, retry_after: float = None,
+               sent_at: float = None) -> bool:
+        """Feed back one response (status None for a timeout or connection error); True if the rate changed.
+
+        `sent_at` is the time.monotonic() at which the request was sent, so that responses to requests sent
+        before the last cut do not cut the rate again.
+        """
+        with self.lock:
+            old_rate = self.rate
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+            if status is None or status in THROTTLE_STATUSES:
+                self.healthy_streak = 0
+                if sent_at is None or sent_at >= self.last_cut:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self.last_cut = time.monotonic()
+                reason = f"{status or 'error'} response"
+            elif status >= 500 or (latency is not None and latency > self.latency_target):
+                self.healthy_streak = 0
+                return False
+            else:
+                self.healthy_streak += 1
+                if self.healthy_streak < self.window:
+                    return False
+                self.healthy_streak = 0
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                reason = f"{self.window} healthy responses"
+
+        if self.rate == old_rate:
+            return False
+        logger.info(f"Request rate for {self.host}: {old_rate:.2f} -> {self.rate:.2f}/s after {reason}")
+        return True
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Memory-compact product records.
+
+A scraped product used to be a 14-key dict per watch: a hash table, two
+timestamp strings and a derived description string each. ProductRecord
+keeps the same data in slots instead:
+
+    - brand, condition, completeness, scraped_from and product_type
+      take few distinct values and are interned, so records share them
+    - description is only stored when it is not "{brand} {reference}"
+    - created is only stored when it differs from scraped_at
+
+A record is a read-only Mapping with the same keys, in the same order, as the
+dict it replaces, so product['brand'], product.get('year'), dict(product) and
+comparisons with dicts work unchanged. to_dict() (or json_default as the
+`default` of json.dump) turns it back into the exact JSON shape.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Union
+
+PRODUCT_FIELDS = ('brand', 'reference', 'description', 'condition', 'product_url', 'price_usd', 'price_idr',
+                  'price_hkd', 'year', 'completeness', 'scraped_from', 'scraped_at', 'product_type', 'created')
+_FIELD_SET = frozenset(PRODUCT_FIELDS)
+
+
+def _interned(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProductRecord(Mapping):
+    """One product, stored in slots with shared categorical strings; reads like the product dict."""
+
+    __slots__ = ('brand', 'reference', '_description', 'condition', 'product_url', 'price_usd', 'price_idr',
+                 'price_hkd', 'year', 'completeness', 'scraped_from', 'scraped_at', 'product_type', '_created')
+
+    def __init__(self, brand: str, reference: str, condition: Optional[str], product_url: str,
+                 price_hkd: Optional[int], year: Optional[int], completeness: Optional[str], scraped_at: str,
+                 description: str = None, created: str = None, price_usd: Optional[int] = None,
+                 price_idr: Optional[int] = None, scraped_from: str = 'aristohk.com', product_type: str = 'watches'):
+        self.brand = _interned(brand)
+        self.reference = reference
+        self.condition = _interned(condition)
+        self.product_url = product_url
+        self.price_usd = price_usd
+        self.price_idr = price_idr
+        self.price_hkd = price_hkd
+        self.year = year
+        self.completeness = _interned(completeness)
+        self.scraped_from = _interned(scraped_from)
+        self.scraped_at = scraped_at
+        self.product_type = _interned(product_type)
+        self._description = None if description == f"{brand} {reference}" else description
+        self._created = None if created == scraped_at else created
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            return f"{self.brand} {self.reference}"
+        return self._description
+
+    @property
+    def created(self) -> str:
+        return self.scraped_at if self._created is None else self._created
+
+    @classmethod
+    def from_dict(cls, product: Dict) -> 'ProductRecord':
+        """Build a record from a product dict with exactly the standard keys."""
+        return cls(**product)
+
+    def to_dict(self) -> Dict:
+        """The product as the dict the scraper writes to JSON."""
+        return {field: getattr(self, field) for field in PRODUCT_FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PRODUCT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PRODUCT_FIELDS)
+
+    def __reduce__(self):
+        # Slots only, so pickle the constructor arguments (records cross the parse pool)
+        return (self.__class__.from_dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"ProductRecord({self.to_dict()!r})"
+
+
+def compact(product: Dict) -> Union[ProductRecord, Dict]:
+    """Turn a product dict of the standard shape into a ProductRecord; other dicts are returned unchanged."""
+    if product.keys() == _FIELD_SET:
+        return ProductRecord.from_dict(product)
+    return product
+
+
+def json_default(obj: Any) -> Dict:
+    """`default` for json.dump/dumps that serializes ProductRecords as their dicts."""
+    if isinstance(obj, ProductRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -7,81 +7,480 @@ Usage:
     python aristohk_scraper.py --all --output watches.json
     python aristohk_scraper.py --pages 1-5 --output limited_watches.json
     python aristohk_scraper.py --brand rolex --output rolex_watches.json
+    python aristohk_scraper.py --all --engine async --concurrency 16 --output watches.json
+    python aristohk_scraper.py --all --workers 8 --rate 4 --burst 8 --output watches.json
+    python aristohk_scraper.py --all --workers 8 --adaptive --max-rate 10 --output watches.json
+    python aristohk_scraper.py --all --breaker-threshold 3 --breaker-reset 60 --output watches.json
+    python aristohk_scraper.py --all --engine async --parse-workers 4 --output watches.json
+    python aristohk_scraper.py --all --parser selectolax --output watches.json
+    python aristohk_scraper.py --all --cache http_cache.sqlite3 --output watches.json
+    python aristohk_scraper.py --all --since watches.json --output watches_today.json
+    python aristohk_scraper.py --all --visited seen_ids.bin --output new_watches.json
+    python aristohk_scraper.py --all --format jsonl --output - | consumer
+    python aristohk_scraper.py --all --format parquet --output watches.parquet
+    python aristohk_scraper.py --resume --output watches.json
+    python aristohk_scraper.py --all --brand-cache brands.json --output watches.json
+    python aristohk_scraper.py --all --discovery sitemap --since watches.json --output watches_today.json
+    python aristohk_scraper.py --all --base-url http://127.0.0.1:8000 --delay 0 --output replay.json
+    python aristohk_scraper.py --all --metrics-prom /var/lib/node_exporter/aristohk.prom --output watches.json
+    python aristohk_scraper.py --all --replay corpus/ --profile crawl.prof --output replay.json
+    python aristohk_scraper.py --all --profile /var/tmp/aristohk.stacks --profile-mode sample --profile-rate 0.05
+    python aristohk_scraper.py --all --archive crawl.warc.gz --output watches.json
+    python aristohk_scraper.py --all --workers 8 --rate 4 --transport httpx --metrics-json metrics.json
+    python aristohk_scraper.py --all --log-json --log-sample-rate 0.1 --log-file crawl.log --output watches.json
 """
 
 import requests
-from bs4 import BeautifulSoup
+import asyncio
 import json
+import os
 import time
 import argparse
+import random
 import re
 import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Optional, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple, Union
+from xml.etree import ElementTree
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+from aristohk_archive import PageArchive
+from aristohk_breaker import DEFAULT_RESET_TIMEOUT, DEFAULT_THRESHOLD, CircuitBreakers
+from aristohk_brands import (BRAND_EMPTY, BRAND_MISSING, DEFAULT_PROBE_TTL, PROBE_CHUNK_SIZE, PROBE_WORKERS,
+                             BrandProbeCache, ProductLinkSniffer, classify_probe)
+from aristohk_cache import DEFAULT_MAX_BYTES, HttpCache
+from aristohk_checkpoint import CrawlCheckpoint
+from aristohk_columnar import COLUMNAR_FORMATS, ColumnarWriter, check_columnar
+from aristohk_fields import FieldScanner
+from aristohk_output import OUTPUT_FORMATS, JsonLinesWriter, ProductSink, jsonl_to_json, load_products
+from aristohk_html import HtmlDocument, PARSER_BACKENDS, check_parser_backend, parse_document
+from aristohk_logging import DEFAULT_LOG_FILE, configure_logging, init_worker_logging, worker_logging_args
+from aristohk_memo import DEFAULT_MAX_PAGES, PageMemo
+from aristohk_metrics import CrawlMetrics
+from aristohk_parse_pool import ParsePool
+from aristohk_profile import DEFAULT_SAMPLE_INTERVAL, PROFILE_MODES, make_profile, write_profile
+from aristohk_record import ProductRecord, compact, json_default
+from aristohk_ratecontrol import DEFAULT_MAX_RATE, AimdController, parse_retry_after
+from aristohk_sitemap import SITEMAP_CHUNK_SIZE, SitemapParser, sitemaps_from_robots
+from aristohk_transport import TRANSPORTS, aiohttp_wire_bytes, check_transport, create_session, wire_bytes
+from aristohk_urls import product_id_from_url
+from aristohk_visited import (DEFAULT_BLOOM_CAPACITY, VISITED_MODES, IdBitmap, VisitedIds, load_visited,
+                              make_visited, save_visited)
+
+try:
+    import aiohttp
+except ImportError:  # Only required by the async engine
+    aiohttp = None
+
+# Handlers are set up by configure_logging() in main(), not on import
 logger = logging.getLogger(__name__)
 
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second with bursts of up to `burst`."""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class AristoHKScraper:
-    def __init__(self, base_url: str = "https://aristohk.com", delay: float = 0.5):
-        """Initialize the scraper with base URL and request delay."""
+    def __init__(self, base_url: str = "https://aristohk.com", delay: float = 0.5, workers: int = 1,
+                 rate: float = None, burst: int = 1, parser: str = 'html.parser', cache: HttpCache = None,
+                 previous_products: Dict[int, Dict] = None, sink: ProductSink = None,
+                 checkpoint: CrawlCheckpoint = None, memo_pages: int = DEFAULT_MAX_PAGES,
+                 probe_brands: bool = True, brand_cache: BrandProbeCache = None, parse_workers: int = 1,
+                 archive: PageArchive = None, transport: str = 'requests', adaptive: bool = False,
+                 max_rate: float = DEFAULT_MAX_RATE, breakers: CircuitBreakers = None,
+                 known_ids: VisitedIds = None):
+        """Initialize the scraper with base URL and request delay.
+        
+        With `workers` > 1 product pages are fetched by a thread pool. Politeness is
+        then enforced by a per-host token bucket of `rate` requests/second (plus
+        `burst`) instead of sleeping `delay` before every request; `rate` defaults
+        to one request per `delay` seconds.
+        
+        `parser` selects the HTML parser backend (see aristohk_html) and `cache`
+        is an optional on-disk response cache (see aristohk_cache).
+        
+        `previous_products` maps product IDs to records from an earlier snapshot
+        (see load_snapshot). Listings are still crawled in full, but products whose
+        ID is already known are carried over instead of having their page fetched.
+        
+        With a `sink` every product is written out as soon as it is extracted and
+        is not kept in memory, so scrape_brand and scrape_all return empty lists.
+        
+        A `checkpoint` journals page counts, listing pages and products as the
+        crawl progresses; when it was opened for resuming, journaled work is
+        replayed instead of fetched again.
+        
+        The pages read more than once in a run, the homepage and the first
+        listing page of each brand, are kept for reuse (up to `memo_pages`,
+        see aristohk_memo); later listing pages are fetched directly.
+        
+        With `probe_brands`, known brands the homepage does not link to are
+        probed cheaply before crawling and dropped if they are missing or empty
+        (see aristohk_brands); `brand_cache` keeps the results between runs.
+        
+        With `parse_workers` > 1, product pages are extracted in that many
+        worker processes (see aristohk_parse_pool). Fetching then needs to run
+        concurrently to keep them busy, so `workers` is raised to at least
+        `parse_workers`. Call close() when done to stop the workers.
+        
+        An `archive` gets a copy of every page the crawl fetches or takes from
+        the cache (see aristohk_archive).
+        
+        `transport` selects the HTTP client (see aristohk_transport); its
+        connection pool is sized for the fetch and probe threads.
+        
+        With `adaptive`, each host's request rate starts at `rate` (or one per
+        `delay`) and is adjusted between 0.1 and `max_rate` from the responses
+        (see aristohk_ratecontrol) instead of staying fixed. Retry-After is
+        honoured either way.
+        
+        `breakers` fail requests fast while their host or brand section keeps
+        failing (see aristohk_breaker); None retries every URL in full.
+        
+        Product links are deduplicated within the run by their numeric ID (see
+        aristohk_visited). A `known_ids` set loaded from earlier runs makes the
+        crawl skip fetching the products it holds, while their listing pages
+        are still paginated through; scraped_ids collects the IDs of the
+        products recorded in this run, to add to it for the next one.
+        """
+        check_parser_backend(parser)
         self.base_url = base_url
+        self.parser = parser
+        self.cache = cache
+        self.previous_products = previous_products or {}
+        self.carried_over = 0
+        # Previously scraped product IDs whose sitemap lastmod is newer than the snapshot
+        self.changed_products: Set[int] = set()
+        self.sink = sink
+        self.product_count = 0
+        self.checkpoint = checkpoint
+        self.pages = PageMemo(memo_pages)
+        self.metrics = CrawlMetrics()
+        self.probe_brands = probe_brands
+        self.brand_cache = brand_cache or BrandProbeCache()
         self.delay = delay
-        self.session = requests.Session()
+        self.workers = max(1, workers, parse_workers)
+        self.archive = archive
+        self.parse_pool = None
+        if parse_workers > 1:
+            self.parse_pool = ParsePool(parse_workers, partial(extract_product, parser=self.parser),
+                                        initializer=init_worker_logging, initargs=worker_logging_args())
+        if rate is None and self.workers > 1 and delay > 0:
+            rate = 1 / delay
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.max_rate = max_rate
+        self.transport = transport
+        self.breakers = breakers
+        self.session = create_session(transport, pool_size=max(self.workers, PROBE_WORKERS))
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.scraped_products: List[Dict] = []
-        self.visited_urls: Set[str] = set()
+        # Product IDs already listed in this run; known_ids are those of earlier runs
+        self.visited = IdBitmap()
+        self.known_ids = known_ids
+        self.skipped_known = 0
+        # Product hrefs without a numeric ID, deduplicated as strings
+        self.visited_hrefs: Set[str] = set()
+        self.scraped_ids = IdBitmap()
+        self.rate_limiters: Dict[str, Union[TokenBucket, AimdController]] = {}
+        self._lock = threading.Lock()
+        
+    def _rate_limiter(self, url: str) -> Optional[Union[TokenBucket, AimdController]]:
+        """Get the shared token bucket or adaptive controller for the URL's host, if rate limiting is enabled."""
+        if not self.rate and not self.adaptive:
+            return None
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.rate_limiters:
+                if self.adaptive:
+                    rate = self.rate or (1 / self.delay if self.delay > 0 else self.max_rate)
+                    self.rate_limiters[host] = AimdController(host, rate, max_rate=self.max_rate)
+                    self.metrics.set_request_rate(host, self.rate_limiters[host].rate)
+                else:
+                    self.rate_limiters[host] = TokenBucket(self.rate, self.burst)
+            return self.rate_limiters[host]
+    
+    def _rate_feedback(self, url: str, status: Optional[int], sent_at: float, headers=None):
+        """Report a response (None for a failed request) to the host's adaptive rate controller."""
+        if not self.adaptive:
+            return
+        controller = self._rate_limiter(url)
+        retry_after = parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+        if controller.record(status, time.monotonic() - sent_at, retry_after, sent_at):
+            self.metrics.set_request_rate(controller.host, controller.rate)
+    
+    def _circuit_allows(self, url: str) -> bool:
+        """Check the URL's circuit breakers, counting and logging a request that fails fast."""
+        if self.breakers is None:
+            return True
+        key = self.breakers.allow(url)
+        if key is None:
+            return True
+        self.metrics.record_short_circuit(key[0])
+        logger.warning(f"Circuit for {key[0]} {key[1]} is open, skipping {url}", extra={'url': url})
+        return False
+    
+    def _circuit_feedback(self, url: str, status: Optional[int]):
+        """Report a response (None for a failed request) to the URL's circuit breakers."""
+        if self.breakers is None:
+            return
+        for scope, _ in self.breakers.record(url, status is not None and status < 500):
+            self.metrics.record_circuit_open(scope)
+    
+    def _report_short_circuits(self):
+        """Log the sections whose pages were skipped by an open circuit breaker."""
+        if not self.metrics.short_circuits:
+            return
+        still_open = ', '.join(name for _, name in self.breakers.open_breakers()) or 'none'
+        logger.warning(f"{sum(self.metrics.short_circuits.values())} requests failed fast on open circuits "
+                       f"(still open: {still_open}); rerun with --resume to fetch the skipped pages")
+    
+    @staticmethod
+    def _backoff(attempt: int, headers=None) -> float:
+        """Seconds to wait before the next attempt: the server's Retry-After if given, else exponential."""
+        retry_after = parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+        return retry_after if retry_after is not None else 2 ** attempt
+    
+    def _wait_for_turn(self, url: str):
+        """Apply the politeness policy before a request."""
+        limiter = self._rate_limiter(url)
+        if limiter:
+            limiter.acquire()
+        elif self.delay > 0:
+            time.sleep(self.delay)
+    
+    def _record_product(self, product: Dict):
+        """Stream an extracted product to the sink, or remember it so partial results survive interruptions."""
+        product_id = product_id_from_url(product.get('product_url', ''))
+        with self._lock:
+            self.product_count += 1
+            if product_id is not None:
+                self.scraped_ids.add(product_id)
+            self.metrics.record_product(product.get('brand', 'Unknown'))
+            if self.sink:
+                with self.metrics.time('write'):
+                    self.sink.write(product)
+            else:
+                self.scraped_products.append(product)
+    
+    def _archive_page(self, url: str, content: bytes, headers=None):
+        """Append a page the crawl used to the archive, if one is configured."""
+        if self.archive is not None:
+            with self.metrics.time('archive'):
+                self.archive.append(url, content, headers=headers)
+    
+    def fetch_content(self, url: str, retries: int = 3) -> Optional[bytes]:
+        """Fetch the raw body of a web page with retry logic."""
+        # Serve fresh cache entries directly and revalidate stale ones
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            logger.info(f"Cache hit: {url}", extra={'url': url})
+            self.metrics.record_cache_hit()
+            self._archive_page(url, cached.body)
+            return cached.body
+        headers = cached.revalidation_headers() if cached else {}
         
-    def get_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
-        """Get a web page with retry logic."""
         for attempt in range(retries):
+            if not self._circuit_allows(url):
+                return None
+            if attempt:
+                self.metrics.record_retry()
+            sent_at = None
             try:
-                if self.delay > 0:
-                    time.sleep(self.delay)
+                self._wait_for_turn(url)
                 
-                response = self.session.get(url, timeout=30)
+                sent_at = time.monotonic()
+                with self.metrics.time('fetch'):
+                    response = self.session.get(url, timeout=30, headers=headers)
+                self.metrics.record_response(response.status_code, len(response.content), wire_bytes(response))
+                self._rate_feedback(url, response.status_code, sent_at, response.headers)
+                self._circuit_feedback(url, response.status_code)
+                if cached and response.status_code == 304:
+                    self.cache.refresh(url, response.headers)
+                    logger.info(f"Not modified: {url}", extra={'url': url})
+                    self._archive_page(url, cached.body, response.headers)
+                    return cached.body
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                logger.info(f"Successfully fetched: {url}")
-                return soup
+                if self.cache:
+                    self.cache.store(url, response.content, response.headers)
+                logger.info(f"Successfully fetched: {url}", extra={'url': url})
+                self._archive_page(url, response.content, response.headers)
+                return response.content
                 
             except requests.exceptions.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+                if e.response is None:
+                    self.metrics.record_response('error')
+                    if sent_at is not None:
+                        self._rate_feedback(url, None, sent_at)
+                        self._circuit_feedback(url, None)
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}", extra={'url': url})
                 if attempt == retries - 1:
-                    logger.error(f"Failed to fetch {url} after {retries} attempts")
+                    logger.error(f"Failed to fetch {url} after {retries} attempts", extra={'url': url})
+                    self.metrics.record_failure()
                     return None
-                time.sleep(2 ** attempt)  # Exponential backoff
+                time.sleep(self._backoff(attempt, e.response.headers if e.response is not None else None))
         
         return None
     
+    def parse_html(self, content: bytes) -> HtmlDocument:
+        """Parse a raw page body with the configured parser backend."""
+        with self.metrics.time('parse'):
+            return parse_document(content, self.parser)
+    
+    def _extract(self, product_url: str, doc: HtmlDocument) -> Optional[Dict]:
+        """Extract a product from a parsed page, timing the extract stage."""
+        with self.metrics.time('extract'):
+            return self.parse_product_details(product_url, doc)
+    
+    def _extract_in_pool(self, product_url: str, content: bytes) -> Optional[Dict]:
+        """Extract a product in the parse pool, timing the round trip."""
+        with self.metrics.time('pool'):
+            return self.parse_pool.submit(product_url, content).result()
+    
+    def get_page(self, url: str, retries: int = 3) -> Optional[HtmlDocument]:
+        """Get a web page with retry logic, reusing it if it was already loaded this run."""
+        return self.pages.get(url, lambda: self._load_page(url, retries))
+    
+    def get_listing_page(self, brand_url: str, page: int) -> Optional[HtmlDocument]:
+        """Get a brand listing page; only the first one, also read to count the pages, is memoized."""
+        url = self.listing_page_url(brand_url, page)
+        if page == 1:
+            return self.get_page(url)
+        return self._load_page(url)
+    
+    def _load_page(self, url: str, retries: int = 3) -> Optional[HtmlDocument]:
+        """Fetch and parse a web page."""
+        content = self.fetch_content(url, retries)
+        if content is None:
+            return None
+        return self.parse_html(content)
+    
     def discover_brands(self) -> List[Dict[str, str]]:
         """Discover all brands available on the website."""
         logger.info("Discovering brands...")
         
-        soup = self.get_page(self.base_url)
-        if not soup:
+        doc = self.get_page(self.base_url)
+        if not doc:
             logger.error("Failed to load homepage")
             return []
         
+        brands = self.parse_brands(doc)
+        if not self.probe_brands:
+            return brands
+        
+        states, unprobed = self._cached_probes(self._probe_candidates(brands, doc))
+        if unprobed:
+            with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(unprobed))) as pool:
+                probed = dict(zip((brand['url'] for brand in unprobed), pool.map(self.probe_brand, unprobed)))
+            self._remember_probes(probed)
+            states.update(probed)
+        return self._drop_dead_brands(brands, states)
+    
+    def _probe_candidates(self, brands: List[Dict[str, str]], homepage: HtmlDocument) -> List[Dict[str, str]]:
+        """Return the brands the homepage does not link to; only these guesses are worth probing."""
+        links = set(homepage.links())
+        return [brand for brand in brands if '/' + brand['slug'] not in links]
+    
+    def _cached_probes(self, candidates: List[Dict[str, str]]) -> Tuple[Dict[str, Optional[str]], List[Dict[str, str]]]:
+        """Split candidates into cached probe results and brands that still need probing."""
+        states = {}
+        unprobed = []
+        for brand in candidates:
+            state = self.brand_cache.get(brand['url'])
+            if state:
+                states[brand['url']] = state
+            else:
+                unprobed.append(brand)
+        return states, unprobed
+    
+    def _remember_probes(self, probed: Dict[str, Optional[str]]):
+        """Cache conclusive probe results."""
+        for brand_url, state in probed.items():
+            if state:
+                self.brand_cache.set(brand_url, state)
+        self.brand_cache.save()
+    
+    def _drop_dead_brands(self, brands: List[Dict[str, str]], states: Dict[str, Optional[str]]) -> List[Dict[str, str]]:
+        """Drop brands whose listing is missing or has no products."""
+        live_brands = []
+        for brand in brands:
+            state = states.get(brand['url'])
+            if state in (BRAND_EMPTY, BRAND_MISSING):
+                logger.info(f"Skipping brand {brand['name']}: listing is {state}")
+                continue
+            live_brands.append(brand)
+        
+        if len(live_brands) < len(brands):
+            logger.info(f"Kept {len(live_brands)} of {len(brands)} brands after probing")
+        return live_brands
+    
+    def probe_brand(self, brand: Dict[str, str]) -> Optional[str]:
+        """Check a brand listing with a streamed request, reading only as much body as needed."""
+        url = brand['url']
+        if not self._circuit_allows(url):
+            return None
+        sent_at = None
+        try:
+            self._wait_for_turn(url)
+            sent_at = time.monotonic()
+            with self.session.get(url, timeout=30, stream=True) as response:
+                self._rate_feedback(url, response.status_code, sent_at, response.headers)
+                self._circuit_feedback(url, response.status_code)
+                sniffer = ProductLinkSniffer()
+                complete = True
+                if response.ok:
+                    for chunk in response.iter_content(PROBE_CHUNK_SIZE):
+                        if sniffer.feed(chunk):
+                            complete = False
+                            break
+                self.metrics.record_response(response.status_code, sniffer.read, wire_bytes(response))
+                return classify_probe(response.status_code, response.url, sniffer, complete)
+        except requests.exceptions.RequestException as e:
+            self.metrics.record_response('error')
+            if sent_at is not None:
+                self._rate_feedback(url, None, sent_at)
+                self._circuit_feedback(url, None)
+            logger.warning(f"Probe failed for {url}: {e}")
+            return None
+    
+    def parse_brands(self, doc: HtmlDocument) -> List[Dict[str, str]]:
+        """Build the brand list from a parsed homepage."""
         brands = []
+        links = doc.links()
         
         # Find main feature brands
-        feature_brand_links = soup.find_all('a', href=re.compile(r'^/(rolex|audemars-piguet|patek-philippe|richard-mille)$'))
-        for link in feature_brand_links:
-            href = link.get('href')
+        feature_brand_pattern = re.compile(r'^/(rolex|audemars-piguet|patek-philippe|richard-mille)$')
+        feature_brand_links = [href for href in links if feature_brand_pattern.search(href)]
+        for href in feature_brand_links:
             if href and href.startswith('/'):
                 brand_name = href[1:].replace('-', ' ').upper()
                 brands.append({
@@ -91,9 +490,9 @@ class AristoHKScraper:
                 })
         
         # Find other brands in footer or navigation
-        other_brand_links = soup.find_all('a', href=re.compile(r'^/[a-zA-Z-]+$'))
-        for link in other_brand_links:
-            href = link.get('href')
+        other_brand_pattern = re.compile(r'^/[a-zA-Z-]+$')
+        other_brand_links = [href for href in links if other_brand_pattern.search(href)]
+        for href in other_brand_links:
             if href and href.startswith('/') and len(href.split('/')) == 2:
                 brand_slug = href[1:]
                 # Skip non-brand pages
@@ -134,26 +533,29 @@ class AristoHKScraper:
     
     def get_total_pages(self, brand_url: str) -> int:
         """Get the total number of pages for a brand."""
-        soup = self.get_page(brand_url)
-        if not soup:
+        doc = self.get_page(brand_url)
+        if not doc:
             return 1
         
+        return self.parse_total_pages(doc)
+    
+    def parse_total_pages(self, doc: HtmlDocument) -> int:
+        """Get the total number of pages from a parsed brand listing page."""
         # Look for pagination
-        pagination = soup.find('div', class_='pagination') or soup.find('nav', class_='pagination')
+        pagination = doc.has_element('div', 'pagination') or doc.has_element('nav', 'pagination')
         if not pagination:
             # Try to find pagination links
-            page_links = soup.find_all('a', href=re.compile(r'page=\d+'))
+            page_links = [href for href in doc.links() if re.search(r'page=\d+', href)]
             if page_links:
                 max_page = 1
-                for link in page_links:
-                    href = link.get('href', '')
+                for href in page_links:
                     match = re.search(r'page=(\d+)', href)
                     if match:
                         max_page = max(max_page, int(match.group(1)))
                 return max_page
             
             # Look for specific pagination numbers
-            page_numbers = soup.find_all(text=re.compile(r'^\d+$'))
+            page_numbers = [string for string in doc.strings() if re.search(r'^\d+$', string)]
             if page_numbers:
                 try:
                     return max([int(num.strip()) for num in page_numbers if num.strip().isdigit()])
@@ -164,294 +566,297 @@ class AristoHKScraper:
     
     def extract_product_urls(self, brand_url: str, page: int = 1) -> List[str]:
         """Extract product URLs from a brand page."""
-        page_url = f"{brand_url}?page={page}" if page > 1 else brand_url
-        
-        soup = self.get_page(page_url)
-        if not soup:
+        doc = self.get_listing_page(brand_url, page)
+        if not doc:
             return []
         
+        return self.parse_product_urls(doc, page) or []
+    
+    def _carry_over(self, product_url: str) -> Optional[Dict]:
+        """Return the previous snapshot's record for a product ID that was already scraped."""
+        if not self.previous_products:
+            return None
+        product_id = product_id_from_url(product_url)
+        if product_id in self.changed_products:
+            return None
+        product = self.previous_products.get(product_id)
+        if product is not None:
+            with self._lock:
+                self.carried_over += 1
+        return product
+    
+    def get_product(self, product_url: str) -> Optional[Dict]:
+        """Get a product from the checkpoint or previous snapshot, or freshly extracted."""
+        if self.checkpoint:
+            product = self.checkpoint.completed_product(product_url)
+            if product is not None:
+                return product
+        
+        product = self._carry_over(product_url)
+        if product is None:
+            product = self.extract_product_details(product_url)
+        
+        if self.checkpoint:
+            self.checkpoint.complete(product_url, product)
+        return product
+    
+    def _brand_total_pages(self, brand: Dict[str, str]) -> int:
+        """Get the total number of pages for a brand, from the checkpoint when resuming."""
+        if self.checkpoint:
+            total_pages = self.checkpoint.total_pages(brand['slug'])
+            if total_pages is not None:
+                return total_pages
+        
+        doc = self.get_page(brand['url'])
+        if not doc:
+            return 1
+        
+        total_pages = self.parse_total_pages(doc)
+        if self.checkpoint:
+            self.checkpoint.set_total_pages(brand['slug'], total_pages)
+        return total_pages
+    
+    def _listing_product_urls(self, brand: Dict[str, str], page: int) -> Optional[List[str]]:
+        """Get the new product URLs of a listing page, from the checkpoint when resuming.
+        
+        None means the page could not be loaded or lists no products at all, i.e. the listing ends.
+        """
+        if self.checkpoint:
+            product_urls = self.checkpoint.listing_page(brand['slug'], page)
+            if product_urls is not None:
+                return product_urls
+        
+        doc = self.get_listing_page(brand['url'], page)
+        if not doc:
+            return None
+        
+        product_urls = self.parse_product_urls(doc, page)
+        if self.checkpoint:
+            self.checkpoint.add_listing_page(brand['slug'], page, product_urls or [])
+        return product_urls
+    
+    def _scrape_product(self, product_url: str) -> Optional[Dict]:
+        """Get a product and record it as soon as it is available."""
+        if self._is_known(product_url):
+            return None
+        product = self.get_product(product_url)
+        if product:
+            self._record_product(product)
+        return product
+    
+    def _is_known(self, product_url: str) -> bool:
+        """Check whether an earlier run already scraped a product, counting it as skipped if so."""
+        if self.known_ids is None:
+            return False
+        product_id = product_id_from_url(product_url)
+        if product_id is None or product_id not in self.known_ids:
+            return False
+        with self._lock:
+            self.skipped_known += 1
+        return True
+    
+    def _report_known(self):
+        if self.skipped_known:
+            logger.info(f"Skipped {self.skipped_known} products already scraped by earlier runs")
+    
+    def _mark_visited(self, href: str) -> bool:
+        """Add a product href's ID to this run's visited set, returning False if it was already there."""
+        product_id = product_id_from_url(href)
+        with self._lock:
+            if product_id is not None:
+                return self.visited.add(product_id)
+            if href in self.visited_hrefs:
+                return False
+            self.visited_hrefs.add(href)
+            return True
+    
+    def _resume_visited(self):
+        """Mark the product URLs journaled before an interruption, so listings do not yield them twice."""
+        if self.checkpoint:
+            for path in self.checkpoint.visited_paths():
+                self._mark_visited(path)
+    
+    @staticmethod
+    def listing_page_url(brand_url: str, page: int) -> str:
+        """Build the URL of a brand listing page."""
+        return f"{brand_url}?page={page}" if page > 1 else brand_url
+    
+    def parse_product_urls(self, doc: HtmlDocument, page: int = 1) -> Optional[List[str]]:
+        """Extract the product URLs not yet seen in this run from a parsed brand listing page.
+        
+        Returns None if the page links to no products at all, so pagination can stop there
+        rather than at a page whose products were all listed before.
+        """
         product_urls = []
+        all_links = doc.links()
         
         # Find product links - they usually follow the pattern /{brand}/{series}/{model}/{id}
         # First try specific pattern
-        product_links = soup.find_all('a', href=re.compile(r'^/[^/]+/[^/]+/[^/]+/\d+$'))
+        product_links = [href for href in all_links if re.search(r'^/[^/]+/[^/]+/[^/]+/\d+$', href)]
         
         # If no products found, try broader patterns
         if not product_links:
             # Try alternative patterns
-            product_links = soup.find_all('a', href=re.compile(r'^/[^/]+/[^/]+/\d+$'))
+            product_links = [href for href in all_links if re.search(r'^/[^/]+/[^/]+/\d+$', href)]
         
         if not product_links:
             # Try even broader pattern for any watch product links
-            product_links = soup.find_all('a', href=re.compile(r'/\d+$'))
+            product_links = [href for href in all_links if re.search(r'/\d+$', href)]
         
         # Debug: print all links found
-        all_links = soup.find_all('a', href=True)
         logger.info(f"Total links found on page: {len(all_links)}")
         
         # Filter for product-like links
         potential_products = []
-        for link in all_links:
-            href = link.get('href')
+        for href in all_links:
             if href and ('/' in href) and (href.endswith(tuple(str(i) for i in range(10)))):
                 # Check if it looks like a product URL
                 if len(href.split('/')) >= 3:
                     potential_products.append(href)
         
         logger.info(f"Potential product URLs found: {len(potential_products)}")
+        if not product_links and not potential_products:
+            logger.info(f"Found no product URLs on page {page}")
+            return None
         
-        for link in product_links:
-            href = link.get('href')
-            if href and href not in self.visited_urls:
+        for href in product_links:
+            if href and self._mark_visited(href):
                 full_url = urljoin(self.base_url, href)
                 product_urls.append(full_url)
-                self.visited_urls.add(href)
         
         # If still no products, add potential ones
         if not product_urls:
             for href in potential_products[:10]:  # Limit to first 10 for testing
-                if href not in self.visited_urls:
+                if self._mark_visited(href):
                     full_url = urljoin(self.base_url, href)
                     product_urls.append(full_url)
-                    self.visited_urls.add(href)
         
         logger.info(f"Found {len(product_urls)} product URLs on page {page}")
         return product_urls
     
     def extract_product_details(self, product_url: str) -> Optional[Dict]:
         """Extract product details from a product page."""
-        soup = self.get_page(product_url)
-        if not soup:
+        if self.parse_pool:
+            # Hold a pipeline slot from download to extraction for backpressure
+            with self.parse_pool.slots:
+                content = self.fetch_content(product_url)
+                if content is None:
+                    return None
+                return self._extract_in_pool(product_url, content)
+        
+        # Product pages are only visited once, so they bypass the page memo
+        doc = self._load_page(product_url)
+        if not doc:
             return None
         
-        try:
-            # Extract basic information
-            brand = "Unknown"
-            reference = "Unknown"
-            description = "Unknown"
-            price_hk = None
-            condition = ""
-            year = None
-            completeness = ""
-            
-            # Extract brand from URL
-            url_parts = urlparse(product_url).path.split('/')
-            if len(url_parts) >= 2:
-                brand = url_parts[1].replace('-', ' ').title()
-                if brand.lower() == 'audemars piguet':
-                    brand = 'AUDEMARS PIGUET'
-                elif brand.lower() == 'patek philippe':
-                    brand = 'PATEK PHILIPPE'
-                elif brand.lower() == 'richard mille':
-                    brand = 'RICHARD MILLE'
-                else:
-                    brand = brand.upper()
-            
-            # Extract reference/model from URL - Special handling for Richard Mille
-            if brand.upper() == 'RICHARD MILLE' and len(url_parts) >= 3:
-                # For Richard Mille, extract model code from URL slug
-                # Convert "/rm-65-01-mc-laren/" to "RM65-01"
-                model_slug = url_parts[2]  # e.g., "rm-65-01-mc-laren"
-                if model_slug.startswith('rm-'):
-                    # Extract the model number part (e.g., "65-01" from "rm-65-01-mc-laren")
-                    model_match = re.search(r'rm-(\d+(?:-\d+)*)', model_slug.lower())
-                    if model_match:
-                        model_number = model_match.group(1).replace('-', '-')  # Keep hyphens
-                        reference = f"RM{model_number}"
-                    else:
-                        reference = model_slug.upper().replace('-', '')
+        return self._extract(product_url, doc)
+    
+    @staticmethod
+    def parse_product_brand(product_url: str) -> str:
+        """Get the brand name from a product URL."""
+        brand = "Unknown"
+        url_parts = urlparse(product_url).path.split('/')
+        if len(url_parts) >= 2:
+            brand = url_parts[1].replace('-', ' ').title()
+            if brand.lower() == 'audemars piguet':
+                brand = 'AUDEMARS PIGUET'
+            elif brand.lower() == 'patek philippe':
+                brand = 'PATEK PHILIPPE'
+            elif brand.lower() == 'richard mille':
+                brand = 'RICHARD MILLE'
+            else:
+                brand = brand.upper()
+        
+        return brand
+    
+    @staticmethod
+    def parse_product_reference(product_url: str, brand: str, doc: HtmlDocument) -> str:
+        """Get a product's reference from its URL, falling back to the page title and H1."""
+        reference = "Unknown"
+        url_parts = urlparse(product_url).path.split('/')
+        
+        # Extract reference/model from URL - Special handling for Richard Mille
+        if brand.upper() == 'RICHARD MILLE' and len(url_parts) >= 3:
+            # For Richard Mille, extract model code from URL slug
+            # Convert "/rm-65-01-mc-laren/" to "RM65-01"
+            model_slug = url_parts[2]  # e.g., "rm-65-01-mc-laren"
+            if model_slug.startswith('rm-'):
+                # Extract the model number part (e.g., "65-01" from "rm-65-01-mc-laren")
+                model_match = re.search(r'rm-(\d+(?:-\d+)*)', model_slug.lower())
+                if model_match:
+                    model_number = model_match.group(1).replace('-', '-')  # Keep hyphens
+                    reference = f"RM{model_number}"
                 else:
                     reference = model_slug.upper().replace('-', '')
-            elif len(url_parts) >= 4:
-                reference = url_parts[3].upper().replace('-', '')
-            
-            # For non-Richard Mille brands, use existing logic
-            if brand.upper() != 'RICHARD MILLE':
-                # Try to find reference in page title or H1
-                title = soup.find('title')
-                if title:
-                    title_text = title.get_text()
-                    # Extract model from title like "ROLEX | DAYTONA 126500LN-0002"
-                    if '|' in title_text:
-                        parts = title_text.split('|')
-                        if len(parts) >= 2:
-                            model_part = parts[1].strip()
-                            # Extract the model number
-                            model_match = re.search(r'([A-Z0-9\-]+)$', model_part)
-                            if model_match:
-                                reference = model_match.group(1)
-                
-                # Try H1 for more accurate reference
-                h1 = soup.find('h1')
-                if h1:
-                    h1_text = h1.get_text().strip()
-                    # Extract reference from H1 like "ROLEX 126500LN-0002"
-                    parts = h1_text.split()
+            else:
+                reference = model_slug.upper().replace('-', '')
+        elif len(url_parts) >= 4:
+            reference = url_parts[3].upper().replace('-', '')
+        
+        # For non-Richard Mille brands, use existing logic
+        if brand.upper() != 'RICHARD MILLE':
+            # Try to find reference in page title or H1
+            title_text = doc.first_text('title')
+            if title_text is not None:
+                # Extract model from title like "ROLEX | DAYTONA 126500LN-0002"
+                if '|' in title_text:
+                    parts = title_text.split('|')
                     if len(parts) >= 2:
-                        reference = parts[-1]  # Take the last part as reference
+                        model_part = parts[1].strip()
+                        # Extract the model number
+                        model_match = re.search(r'([A-Z0-9\-]+)$', model_part)
+                        if model_match:
+                            reference = model_match.group(1)
             
-            # Extract price - look for the main product price more accurately
-            all_text = soup.get_text()
-            
-            # Try to find price near the product reference or brand name
+            # Try H1 for more accurate reference
+            h1_text = doc.first_text('h1')
+            if h1_text is not None:
+                h1_text = h1_text.strip()
+                # Extract reference from H1 like "ROLEX 126500LN-0002"
+                parts = h1_text.split()
+                if len(parts) >= 2:
+                    reference = parts[-1]  # Take the last part as reference
+        
+        return reference
+    
+    @staticmethod
+    def parse_product_details(product_url: str, doc: HtmlDocument) -> Optional[ProductRecord]:
+        """Extract product details from a parsed product page into a compact record (see aristohk_record)."""
+        try:
+            # Extract basic information
             price_hk = None
-            
-            # Look for price patterns in the first part of the page (main product area)
-            main_content = all_text[:1500]  # Focus on main product content
-            
-            # Find HK$ pattern and extract numbers after it
-            hk_indices = []
-            for i, char in enumerate(main_content):
-                if main_content[i:i+3] == 'HK$':
-                    hk_indices.append(i)
-            
-            # Extract the first meaningful price from main content
-            for idx in hk_indices:
-                price_text = main_content[idx+3:idx+20]
-                number_match = re.match(r'([\d,]+)', price_text)
-                if number_match:
-                    price_str = number_match.group(1)
-                    try:
-                        price_num = int(price_str.replace(',', ''))
-                        if price_num > 10000:  # Main product prices are usually substantial
-                            # Check if this price is followed by "Ask Price" in close proximity
-                            surrounding_text = main_content[max(0, idx-50):idx+100]
-                            if not re.search(r'Ask Price', surrounding_text, re.I):
-                                price_hk = price_num
-                                break
-                    except ValueError:
-                        continue
-            
-            # If no price found or if Ask Price is the main price indication
-            if price_hk is None:
-                # Check if "Ask Price" is specifically mentioned for this product
-                ask_price_pattern = re.search(r'Ask Price', main_content, re.I)
-                if ask_price_pattern:
-                    price_hk = None  # Explicitly set to None for "Ask Price" products
-            
-            # Extract condition - check main content first
-            main_content = all_text[:1500]
-            if re.search(r'HOT', main_content, re.I):
-                condition = "New"
-            elif re.search(r'Pre-owned', main_content, re.I):
-                condition = "Pre-owned"
-            else:
-                condition = "New"  # Default assumption
-            
-            # Extract year with improved logic targeting both structured data and description text
+            condition = ""
             year = None
+            completeness = ""
             
-            # Method 1: Look for structured "Release Year" field (most accurate)
-            # This appears in tables/structured data sections
-            structured_patterns = [
-                r'Release Year[:\s]*(\d{4})',           # "Release Year: 2020" or "Release Year 2020"
-                r'Release Year[:\s]*(\d{4})',           # Case variations
-                r'(?i)release\s*year[:\s]*(\d{4})',     # Case insensitive with optional space
-            ]
-            
-            for pattern in structured_patterns:
-                year_match = re.search(pattern, all_text, re.I)
-                if year_match:
-                    try:
-                        potential_year = int(year_match.group(1))
-                        if 1950 <= potential_year <= 2027:
-                            year = potential_year
-                            break
-                    except ValueError:
-                        continue
-            
-            # Method 2: If no structured Release Year found, look in description text
-            if year is None:
-                description_patterns = [
-                    r'released in (\d{4})',               # "released in 2023"
-                    r'introduced in (\d{4})',             # "introduced in 2020"  
-                    r'launched in (\d{4})',               # "launched in 2021"
-                    r'this model.*?(\d{4})',              # "This model, ... in 2020"
-                ]
-                
-                for pattern in description_patterns:
-                    year_match = re.search(pattern, all_text, re.I)
-                    if year_match:
-                        try:
-                            potential_year = int(year_match.group(1))
-                            if 1950 <= potential_year <= 2027:
-                                year = potential_year
-                                break
-                        except ValueError:
-                            continue
-            
-            # Method 3: As final fallback, look for years in specific contexts 
-            # (but avoid recent years like 2025 which are likely copyright/current year)
-            if year is None:
-                contextual_patterns = [
-                    r'(\d{4})\s*model',                   # "2020 model"
-                    r'(\d{4})\s*edition',                 # "2019 edition"
-                    r'production[:\s]*(\d{4})',           # "production: 2018"
-                ]
-                
-                for pattern in contextual_patterns:
-                    year_match = re.search(pattern, all_text, re.I)
-                    if year_match:
-                        try:
-                            potential_year = int(year_match.group(1))
-                            # Be more restrictive for contextual matches - avoid current/future years
-                            if 1950 <= potential_year <= 2024:
-                                year = potential_year
-                                break
-                        except ValueError:
-                            continue
-            
-            # If still no year found, leave as None (better than guessing wrong)
-            
-            # Extract completeness from Accessories information
-            completeness_parts = []
-            
-            # Look for "With Box" pattern
-            if re.search(r'With Box', all_text, re.I):
-                completeness_parts.append("With Box")
-            
-            # Look for "With Paper" or "With Papers" pattern  
-            if re.search(r'With Papers?', all_text, re.I):
-                completeness_parts.append("With Papers")
-            
-            # Look for "Original" accessories patterns
-            if re.search(r'Original.*box', all_text, re.I):
-                if "With Box" not in completeness_parts:
-                    completeness_parts.append("With Box")
-            
-            if re.search(r'Original.*certificate', all_text, re.I):
-                if "With Papers" not in completeness_parts:
-                    completeness_parts.append("With Papers")
-            
-            # Join completeness parts
-            completeness = ", ".join(completeness_parts) if completeness_parts else ""
+            brand = AristoHKScraper.parse_product_brand(product_url)
+            reference = AristoHKScraper.parse_product_reference(product_url, brand, doc)
             
-            # Create description
-            description = f"{brand} {reference}"
+            # Find every field anchor in the page text once, then resolve price,
+            # condition, year and completeness from those hits
+            fields = FieldScanner(doc.text())
+            price_hk = fields.price()
+            condition = fields.condition()
+            year = fields.year()
+            completeness = fields.completeness()
             
-            # Create product dictionary
-            product = {
-                "brand": brand,
-                "reference": reference,
-                "description": description,
-                "condition": condition,
-                "product_url": product_url,
-                "price_usd": None,
-                "price_idr": None,
-                "price_hkd": price_hk,
-                "year": year,
-                "completeness": completeness,
-                "scraped_from": "aristohk.com",
-                "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
-                "product_type": "watches",
-                "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            }
+            # Create the product record (description and created are derived from these)
+            product = ProductRecord(
+                brand=brand,
+                reference=reference,
+                condition=condition,
+                product_url=product_url,
+                price_hkd=price_hk,
+                year=year,
+                completeness=completeness,
+                scraped_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            )
             
-            logger.info(f"Extracted: {brand} {reference} - HK${price_hk}")
+            logger.info(f"Extracted: {brand} {reference} - HK${price_hk}", extra={'url': product_url})
             return product
             
         except Exception as e:
-            logger.error(f"Error extracting product details from {product_url}: {e}")
+            logger.error(f"Error extracting product details from {product_url}: {e}", extra={'url': product_url})
             return None
     
     def scrape_brand(self, brand: Dict[str, str], start_page: int = 1, end_page: int = None) -> List[Dict]:
@@ -459,36 +864,59 @@ class AristoHKScraper:
         logger.info(f"Scraping brand: {brand['name']}")
         
         brand_products = []
+        brand_count = 0
         
         # Get total pages if end_page is not specified
         if end_page is None:
-            total_pages = self.get_total_pages(brand['url'])
+            total_pages = self._brand_total_pages(brand)
             end_page = total_pages
         
         logger.info(f"Scraping pages {start_page} to {end_page} for {brand['name']}")
         
-        for page in range(start_page, end_page + 1):
-            logger.info(f"Scraping {brand['name']} page {page}")
-            
-            # Get product URLs from this page
-            product_urls = self.extract_product_urls(brand['url'], page)
-            
-            if not product_urls:
-                logger.info(f"No products found on page {page}, stopping")
-                break
+        # Product pages go to a thread pool in --workers mode; listing pages stay sequential
+        pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        futures = []
+        
+        try:
+            for page in range(start_page, end_page + 1):
+                logger.info(f"Scraping {brand['name']} page {page}")
+                
+                # Get product URLs from this page
+                product_urls = self._listing_product_urls(brand, page)
+                
+                if product_urls is None:
+                    logger.info(f"No products found on page {page}, stopping")
+                    break
+                
+                if pool:
+                    futures.extend(pool.submit(self._scrape_product, url) for url in product_urls)
+                    continue
+                
+                # Extract details for each product
+                for product_url in product_urls:
+                    product = self._scrape_product(product_url)
+                    if product:
+                        brand_count += 1
+                        if not self.sink:
+                            brand_products.append(product)
             
-            # Extract details for each product
-            for product_url in product_urls:
-                product = self.extract_product_details(product_url)
+            for future in futures:
+                product = future.result()
                 if product:
-                    brand_products.append(product)
+                    brand_count += 1
+                    if not self.sink:
+                        brand_products.append(product)
+        finally:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
         
-        logger.info(f"Scraped {len(brand_products)} products from {brand['name']}")
+        logger.info(f"Scraped {brand_count} products from {brand['name']}")
         return brand_products
     
     def scrape_all(self, start_page: int = 1, end_page: int = None, specific_brand: str = None) -> List[Dict]:
         """Scrape all products from the website."""
         logger.info("Starting comprehensive scraping...")
+        self._resume_visited()
         
         # Discover all brands
         brands = self.discover_brands()
@@ -506,23 +934,543 @@ class AristoHKScraper:
                 brand_products = self.scrape_brand(brand, start_page, end_page)
                 all_products.extend(brand_products)
                 
-                logger.info(f"Total products scraped so far: {len(all_products)}")
+                logger.info(f"Total products scraped so far: {self.product_count}")
                 
             except Exception as e:
                 logger.error(f"Error scraping brand {brand['name']}: {e}")
                 continue
         
-        logger.info(f"Scraping completed! Total products: {len(all_products)}")
+        logger.info(f"Scraping completed! Total products: {self.product_count}")
+        logger.info(f"Crawl metrics: {self.metrics.summary_line()}")
+        self._report_short_circuits()
+        if self.previous_products:
+            logger.info(f"Carried over {self.carried_over} products from the previous snapshot")
+        self._report_known()
+        if self.pages.hits:
+            logger.info(f"Reused {self.pages.hits} already loaded pages")
+        return all_products
+    
+    def discover_sitemaps(self) -> List[str]:
+        """Find the site's sitemaps in robots.txt, falling back to /sitemap.xml."""
+        robots = self.fetch_content(urljoin(self.base_url, '/robots.txt'))
+        sitemaps = sitemaps_from_robots(robots.decode('utf-8', 'replace')) if robots else []
+        return sitemaps or [urljoin(self.base_url, '/sitemap.xml')]
+    
+    def read_sitemap(self, sitemap_url: str) -> Tuple[List[Tuple[str, Optional[datetime]]], List[str]]:
+        """Stream and parse one sitemap, returning its URL entries and any nested sitemaps."""
+        parser = SitemapParser()
+        entries = []
+        try:
+            self._wait_for_turn(sitemap_url)
+            with self.session.get(sitemap_url, timeout=30, stream=True) as response:
+                self.metrics.record_response(response.status_code)
+                response.raise_for_status()
+                read = 0
+                try:
+                    for chunk in response.iter_content(SITEMAP_CHUNK_SIZE):
+                        read += len(chunk)
+                        entries.extend(parser.feed(chunk))
+                finally:
+                    self.metrics.record_response_bytes(read, wire_bytes(response))
+                entries.extend(parser.close())
+            logger.info(f"Read sitemap {sitemap_url}: {len(entries)} URLs, {len(parser.sitemaps)} nested sitemaps")
+        except (requests.exceptions.RequestException, ElementTree.ParseError, zlib.error) as e:
+            logger.error(f"Failed to read sitemap {sitemap_url}: {e}")
+        return entries, parser.sitemaps
+    
+    def iter_sitemap_products(self, specific_brand: str = None) -> Iterator[List[Tuple[str, Optional[datetime]]]]:
+        """Yield the product URLs of each sitemap in turn, following nested sitemap indexes."""
+        pending = self.discover_sitemaps()
+        seen_sitemaps = set()
+        while pending:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+            
+            entries, nested = self.read_sitemap(sitemap_url)
+            pending.extend(nested)
+            products = [(url, lastmod) for url, lastmod in entries if self._is_product_url(url, specific_brand)]
+            if products:
+                yield products
+    
+    def _is_product_url(self, url: str, specific_brand: str = None) -> bool:
+        """Check whether a sitemap URL is a product page, optionally of one brand."""
+        segments = [segment for segment in urlparse(url).path.split('/') if segment]
+        if len(segments) < 2 or product_id_from_url(url) is None:
+            return False
+        return specific_brand is None or segments[0].lower() == specific_brand.lower()
+    
+    def _note_lastmod(self, product_url: str, lastmod: Optional[datetime]):
+        """Refetch a previously scraped product if the sitemap says it changed since."""
+        if lastmod is None or not self.previous_products:
+            return
+        product_id = product_id_from_url(product_url)
+        previous = self.previous_products.get(product_id)
+        if not previous or not previous.get('scraped_at'):
+            return
+        try:
+            scraped_at = datetime.fromisoformat(previous['scraped_at'])
+        except ValueError:
+            return
+        if lastmod > scraped_at:
+            self.changed_products.add(product_id)
+    
+    def _scrape_products(self, product_urls: List[str]) -> List[Dict]:
+        """Scrape product pages in order, on the thread pool in --workers mode."""
+        if self.workers == 1:
+            products = [self._scrape_product(url) for url in product_urls]
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+            try:
+                products = list(pool.map(self._scrape_product, product_urls))
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        return [product for product in products if product]
+    
+    def scrape_sitemap(self, specific_brand: str = None) -> List[Dict]:
+        """Scrape the products listed in the site's sitemaps instead of crawling brand listings."""
+        logger.info("Starting sitemap-driven scraping...")
+        
+        all_products = []
+        for batch, entries in enumerate(self.iter_sitemap_products(specific_brand)):
+            product_urls = []
+            for url, lastmod in entries:
+                if not self._mark_visited(urlparse(url).path):
+                    continue
+                self._note_lastmod(url, lastmod)
+                product_urls.append(url)
+            
+            if self.checkpoint:
+                self.checkpoint.add_listing_page('sitemap', batch, product_urls)
+            products = self._scrape_products(product_urls)
+            if not self.sink:
+                all_products.extend(products)
+            logger.info(f"Total products scraped so far: {self.product_count}")
+        
+        logger.info(f"Scraping completed! Total products: {self.product_count}")
+        logger.info(f"Crawl metrics: {self.metrics.summary_line()}")
+        self._report_short_circuits()
+        if self.previous_products:
+            logger.info(f"Carried over {self.carried_over} products from the previous snapshot, "
+                        f"{len(self.changed_products)} refetched as changed")
+        self._report_known()
         return all_products
     
     def save_to_json(self, products: List[Dict], filename: str):
         """Save products to JSON file."""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=2, ensure_ascii=False)
+            with self.metrics.time('write'), open(filename, 'w', encoding='utf-8') as f:
+                json.dump(products, f, indent=2, ensure_ascii=False, default=json_default)
             logger.info(f"Saved {len(products)} products to {filename}")
         except Exception as e:
             logger.error(f"Error saving to {filename}: {e}")
+    
+    def close(self):
+        """Stop the parse worker processes, if any, and close the archive, the cache and the HTTP session."""
+        self.session.close()
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+        if self.archive is not None:
+            self.archive.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+class AsyncAristoHKScraper(AristoHKScraper):
+    """Scraper that fetches listing and product pages concurrently with asyncio.
+    
+    Parsing and extraction reuse the synchronous scraper's methods, so the
+    produced product dicts are identical; only the fetching is concurrent,
+    bounded by a global ``concurrency`` cap.
+    """
+    
+    def __init__(self, base_url: str = "https://aristohk.com", delay: float = 0.5, concurrency: int = 8,
+                 parser: str = 'html.parser', cache: HttpCache = None, previous_products: Dict[int, Dict] = None,
+                 sink: ProductSink = None, checkpoint: CrawlCheckpoint = None,
+                 memo_pages: int = DEFAULT_MAX_PAGES, probe_brands: bool = True,
+                 brand_cache: BrandProbeCache = None, parse_workers: int = 1, archive: PageArchive = None,
+                 adaptive: bool = False, max_rate: float = DEFAULT_MAX_RATE, breakers: CircuitBreakers = None,
+                 known_ids: VisitedIds = None):
+        """Initialize the scraper with base URL, request delay and concurrency cap."""
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp (pip install aiohttp)")
+        super().__init__(base_url, delay, parser=parser, cache=cache, previous_products=previous_products,
+                         sink=sink, checkpoint=checkpoint, memo_pages=memo_pages, probe_brands=probe_brands,
+                         brand_cache=brand_cache, parse_workers=parse_workers, archive=archive,
+                         adaptive=adaptive, max_rate=max_rate, breakers=breakers, known_ids=known_ids)
+        self.concurrency = max(1, concurrency)
+        self._parse_slots: Optional[asyncio.Semaphore] = None
+        self._parse_slots_loop = None
+    
+    def _pipeline_slots(self) -> asyncio.Semaphore:
+        """Get the event loop's semaphore bounding product pages between fetch and extraction."""
+        loop = asyncio.get_running_loop()
+        if self._parse_slots_loop is not loop:
+            self._parse_slots = asyncio.Semaphore(self.parse_pool.max_pending)
+            self._parse_slots_loop = loop
+        return self._parse_slots
+    
+    def _client_session(self) -> 'aiohttp.ClientSession':
+        """Create an aiohttp session mirroring the synchronous session's headers."""
+        return aiohttp.ClientSession(
+            headers=dict(self.session.headers),
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+    
+    async def _archive_page_async(self, url: str, content: bytes, headers=None):
+        """Archive a page on a worker thread, keeping compression and disk writes off the event loop."""
+        if self.archive is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._archive_page, url, content, headers)
+    
+    async def _wait_for_turn_async(self, url: str):
+        """Apply the politeness policy before a request without blocking the event loop."""
+        if self.adaptive:
+            wait = self._rate_limiter(url).reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        elif self.delay > 0:
+            await asyncio.sleep(self.delay)
+    
+    async def fetch_content_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                  url: str, retries: int = 3) -> Optional[bytes]:
+        """Fetch the raw body of a web page with retry logic, holding a concurrency slot."""
+        # Serve fresh cache entries directly and revalidate stale ones
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            logger.info(f"Cache hit: {url}", extra={'url': url})
+            self.metrics.record_cache_hit()
+            await self._archive_page_async(url, cached.body)
+            return cached.body
+        headers = cached.revalidation_headers() if cached else {}
+        
+        for attempt in range(retries):
+            if not self._circuit_allows(url):
+                return None
+            if attempt:
+                self.metrics.record_retry()
+            sent_at = None
+            try:
+                async with semaphore:
+                    await self._wait_for_turn_async(url)
+                    
+                    sent_at = time.monotonic()
+                    with self.metrics.time('fetch'):
+                        async with session.get(url, headers=headers) as response:
+                            self._rate_feedback(url, response.status, sent_at, response.headers)
+                            self._circuit_feedback(url, response.status)
+                            if cached and response.status == 304:
+                                self.metrics.record_response(304)
+                                self.cache.refresh(url, response.headers)
+                                content = cached.body
+                            else:
+                                response.raise_for_status()
+                                content = await response.read()
+                                self.metrics.record_response(response.status, len(content),
+                                                             aiohttp_wire_bytes(response))
+                                if self.cache:
+                                    self.cache.store(url, content, response.headers)
+                
+                if response.status == 304:
+                    logger.info(f"Not modified: {url}", extra={'url': url})
+                else:
+                    logger.info(f"Successfully fetched: {url}", extra={'url': url})
+                await self._archive_page_async(url, content, response.headers)
+                return content
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                answered = isinstance(e, aiohttp.ClientResponseError)
+                self.metrics.record_response(e.status if answered else 'error')
+                if not answered and sent_at is not None:
+                    self._rate_feedback(url, None, sent_at)
+                    self._circuit_feedback(url, None)
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}", extra={'url': url})
+                if attempt == retries - 1:
+                    logger.error(f"Failed to fetch {url} after {retries} attempts", extra={'url': url})
+                    self.metrics.record_failure()
+                    return None
+                # Back off without holding a slot
+                await asyncio.sleep(self._backoff(attempt, e.headers if answered else None))
+        
+        return None
+    
+    async def get_page_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                             url: str, retries: int = 3) -> Optional[HtmlDocument]:
+        """Get a web page with retry logic, reusing it if it was already loaded this run."""
+        return await self.pages.get_async(url, lambda: self._load_page_async(session, semaphore, url, retries))
+    
+    async def _load_page_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                               url: str, retries: int = 3) -> Optional[HtmlDocument]:
+        """Fetch and parse a web page."""
+        content = await self.fetch_content_async(session, semaphore, url, retries)
+        if content is None:
+            return None
+        return self.parse_html(content)
+    
+    async def probe_brand_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                brand: Dict[str, str]) -> Optional[str]:
+        """Check a brand listing with a streamed request, reading only as much body as needed.
+        
+        Probes are paced, rate-controlled and circuit-broken like every other request.
+        """
+        url = brand['url']
+        if not self._circuit_allows(url):
+            return None
+        sent_at = None
+        try:
+            async with semaphore:
+                await self._wait_for_turn_async(url)
+                
+                sent_at = time.monotonic()
+                async with session.get(url) as response:
+                    self._rate_feedback(url, response.status, sent_at, response.headers)
+                    self._circuit_feedback(url, response.status)
+                    sniffer = ProductLinkSniffer()
+                    complete = True
+                    if response.status < 400:
+                        async for chunk in response.content.iter_chunked(PROBE_CHUNK_SIZE):
+                            if sniffer.feed(chunk):
+                                complete = False
+                                break
+                    self.metrics.record_response(response.status, sniffer.read)
+                    return classify_probe(response.status, str(response.url), sniffer, complete)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.metrics.record_response('error')
+            if sent_at is not None:
+                self._rate_feedback(url, None, sent_at)
+                self._circuit_feedback(url, None)
+            logger.warning(f"Probe failed for {url}: {e}")
+            return None
+    
+    async def _discover_brands_async(self, session: 'aiohttp.ClientSession',
+                                     semaphore: asyncio.Semaphore) -> List[Dict[str, str]]:
+        """Discover brands from the homepage, probing unlinked candidates concurrently."""
+        logger.info("Discovering brands...")
+        homepage = await self.get_page_async(session, semaphore, self.base_url)
+        if homepage is None:
+            logger.error("Failed to load homepage")
+            return []
+        
+        brands = self.parse_brands(homepage)
+        if not self.probe_brands:
+            return brands
+        
+        states, unprobed = self._cached_probes(self._probe_candidates(brands, homepage))
+        if unprobed:
+            results = await asyncio.gather(*(self.probe_brand_async(session, semaphore, brand) for brand in unprobed))
+            probed = dict(zip((brand['url'] for brand in unprobed), results))
+            self._remember_probes(probed)
+            states.update(probed)
+        return self._drop_dead_brands(brands, states)
+    
+    async def _fetch_listing_pages(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                   brand: Dict[str, str], start_page: int,
+                                   end_page: Optional[int]) -> List[Tuple[int, Optional[HtmlDocument]]]:
+        """Fetch a brand's listing pages concurrently, returned in page order."""
+        first_page = None
+        if end_page is None and self.checkpoint:
+            end_page = self.checkpoint.total_pages(brand['slug'])
+        if end_page is None:
+            first_page = await self.get_page_async(session, semaphore, brand['url'])
+            end_page = 1
+            if first_page is not None:
+                end_page = self.parse_total_pages(first_page)
+                if self.checkpoint:
+                    self.checkpoint.set_total_pages(brand['slug'], end_page)
+        
+        logger.info(f"Scraping pages {start_page} to {end_page} for {brand['name']}")
+        
+        async def fetch_listing(page: int) -> Optional[HtmlDocument]:
+            # Journaled pages are replayed by _collect_product_urls
+            if self.checkpoint and self.checkpoint.listing_page(brand['slug'], page) is not None:
+                return None
+            # The first listing page was already fetched to count the pages; only it is memoized
+            if page == 1:
+                return first_page or await self.get_page_async(session, semaphore, brand['url'])
+            return await self._load_page_async(session, semaphore, self.listing_page_url(brand['url'], page))
+        
+        pages = list(range(start_page, end_page + 1))
+        docs = await asyncio.gather(*(fetch_listing(page) for page in pages))
+        return list(zip(pages, docs))
+    
+    def _collect_product_urls(self, brand: Dict[str, str],
+                              listing_pages: List[Tuple[int, Optional[HtmlDocument]]]) -> List[str]:
+        """Parse fetched listing pages in order, stopping at the first empty page like scrape_brand."""
+        product_urls = []
+        for page, doc in listing_pages:
+            logger.info(f"Scraping {brand['name']} page {page}")
+            page_urls = self.checkpoint.listing_page(brand['slug'], page) if self.checkpoint else None
+            if page_urls is None and doc is not None:
+                page_urls = self.parse_product_urls(doc, page)
+                if self.checkpoint:
+                    self.checkpoint.add_listing_page(brand['slug'], page, page_urls or [])
+            
+            if page_urls is None:
+                logger.info(f"No products found on page {page}, stopping")
+                break
+            
+            product_urls.extend(page_urls)
+        
+        return product_urls
+    
+    async def extract_product_details_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                            product_url: str) -> Optional[Dict]:
+        """Fetch a product page and extract its details."""
+        if self.parse_pool:
+            # Hold a pipeline slot from download to extraction for backpressure
+            async with self._pipeline_slots():
+                content = await self.fetch_content_async(session, semaphore, product_url)
+                if content is None:
+                    return None
+                with self.metrics.time('pool'):
+                    return await asyncio.wrap_future(self.parse_pool.submit(product_url, content))
+        
+        content = await self.fetch_content_async(session, semaphore, product_url)
+        if content is None:
+            return None
+        return self._extract(product_url, self.parse_html(content))
+    
+    async def get_product_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                product_url: str) -> Optional[Dict]:
+        """Get a product from the checkpoint or previous snapshot, or freshly extracted."""
+        if self.checkpoint:
+            product = self.checkpoint.completed_product(product_url)
+            if product is not None:
+                return product
+        
+        product = self._carry_over(product_url)
+        if product is None:
+            product = await self.extract_product_details_async(session, semaphore, product_url)
+        
+        if self.checkpoint:
+            self.checkpoint.complete(product_url, product)
+        return product
+    
+    async def _scrape_product_async(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                                    product_url: str) -> Optional[Dict]:
+        """Get a product and record it as soon as it is available."""
+        if self._is_known(product_url):
+            return None
+        product = await self.get_product_async(session, semaphore, product_url)
+        if product:
+            self._record_product(product)
+        return product
+    
+    async def _scrape_brands(self, session: 'aiohttp.ClientSession', semaphore: asyncio.Semaphore,
+                             brands: List[Dict[str, str]], start_page: int, end_page: Optional[int]) -> List[Dict]:
+        """Scrape several brands concurrently, returning products in brand and listing order."""
+        for brand in brands:
+            logger.info(f"Scraping brand: {brand['name']}")
+        
+        listings = await asyncio.gather(
+            *(self._fetch_listing_pages(session, semaphore, brand, start_page, end_page) for brand in brands),
+            return_exceptions=True
+        )
+        
+        # Parse listings sequentially so the visited set dedupes exactly like the sync engine
+        brand_urls = []
+        for brand, listing_pages in zip(brands, listings):
+            if isinstance(listing_pages, Exception):
+                logger.error(f"Error scraping brand {brand['name']}: {listing_pages}")
+                continue
+            brand_urls.append((brand, self._collect_product_urls(brand, listing_pages)))
+        
+        details = await asyncio.gather(
+            *(asyncio.gather(*(self._scrape_product_async(session, semaphore, url) for url in urls))
+              for _, urls in brand_urls),
+            return_exceptions=True
+        )
+        
+        all_products = []
+        for (brand, _), products in zip(brand_urls, details):
+            if isinstance(products, Exception):
+                logger.error(f"Error scraping brand {brand['name']}: {products}")
+                continue
+            
+            brand_products = [product for product in products if product]
+            logger.info(f"Scraped {len(brand_products)} products from {brand['name']}")
+            if not self.sink:
+                all_products.extend(brand_products)
+            logger.info(f"Total products scraped so far: {self.product_count}")
+        
+        return all_products
+    
+    async def scrape_brand_async(self, brand: Dict[str, str], start_page: int = 1, end_page: int = None) -> List[Dict]:
+        """Scrape all products from a specific brand concurrently."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._client_session() as session:
+            return await self._scrape_brands(session, semaphore, [brand], start_page, end_page)
+    
+    async def scrape_all_async(self, start_page: int = 1, end_page: int = None, specific_brand: str = None) -> List[Dict]:
+        """Scrape all products from the website concurrently."""
+        logger.info("Starting comprehensive scraping...")
+        self._resume_visited()
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._client_session() as session:
+            # Discover all brands
+            brands = await self._discover_brands_async(session, semaphore)
+            
+            if specific_brand:
+                brands = [b for b in brands if b['slug'].lower() == specific_brand.lower()]
+                if not brands:
+                    logger.error(f"Brand '{specific_brand}' not found")
+                    return []
+            
+            all_products = await self._scrape_brands(session, semaphore, brands, start_page, end_page)
+        
+        logger.info(f"Scraping completed! Total products: {self.product_count}")
+        logger.info(f"Crawl metrics: {self.metrics.summary_line()}")
+        self._report_short_circuits()
+        if self.previous_products:
+            logger.info(f"Carried over {self.carried_over} products from the previous snapshot")
+        self._report_known()
+        if self.pages.hits:
+            logger.info(f"Reused {self.pages.hits} already loaded pages")
+        return all_products
+    
+    async def _scrape_products_async(self, product_urls: List[str]) -> List[Dict]:
+        """Scrape product pages concurrently, returned in order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._client_session() as session:
+            products = await asyncio.gather(
+                *(self._scrape_product_async(session, semaphore, url) for url in product_urls)
+            )
+        return [product for product in products if product]
+    
+    def _scrape_products(self, product_urls: List[str]) -> List[Dict]:
+        """Scrape product pages concurrently; sitemaps themselves are read with the sync session."""
+        return asyncio.run(self._scrape_products_async(product_urls))
+    
+    def scrape_brand(self, brand: Dict[str, str], start_page: int = 1, end_page: int = None) -> List[Dict]:
+        """Scrape all products from a specific brand."""
+        return asyncio.run(self.scrape_brand_async(brand, start_page, end_page))
+    
+    def scrape_all(self, start_page: int = 1, end_page: int = None, specific_brand: str = None) -> List[Dict]:
+        """Scrape all products from the website."""
+        return asyncio.run(self.scrape_all_async(start_page, end_page, specific_brand))
+
+
+def extract_product(product_url: str, html: bytes, parser: str = 'html.parser') -> Optional[Dict]:
+    """Extract a product from a fetched page body.
+    
+    A pure function of its arguments, so it can run in a worker process.
+    """
+    return AristoHKScraper.parse_product_details(product_url, parse_document(html, parser))
+
+
+def load_snapshot(filename: str) -> Dict[int, Dict]:
+    """Load a previous output file, keyed by product ID."""
+    snapshot = {}
+    for product in load_products(filename):
+        product_id = product_id_from_url(product.get('product_url', ''))
+        if product_id is not None:
+            snapshot[product_id] = compact(product)
+    
+    logger.info(f"Loaded {len(snapshot)} products from {filename}")
+    return snapshot
 
 
 def parse_page_range(page_range: str) -> tuple:
@@ -540,43 +1488,264 @@ def main():
     parser.add_argument('--all', action='store_true', help='Scrape all products from all brands')
     parser.add_argument('--pages', type=str, help='Page range to scrape (e.g., "1-5" or "10")')
     parser.add_argument('--brand', type=str, help='Specific brand to scrape (e.g., "rolex")')
-    parser.add_argument('--output', type=str, default='aristohk_products.json', help='Output JSON filename')
+    parser.add_argument('--output', type=str, default='aristohk_products.json',
+                        help='Output filename ("-" for stdout with --format jsonl)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS + COLUMNAR_FORMATS, default='json',
+                        help='json: one array written at the end; jsonl: one product per line, streamed; '
+                             'parquet/arrow: typed columns, one row group per brand (needs pyarrow)')
+    parser.add_argument('--finalize-json', type=str, metavar='FILE',
+                        help='With --format jsonl, also convert the streamed output to a JSON array file at the end')
+    parser.add_argument('--base-url', type=str, default='https://aristohk.com',
+                        help='Site to scrape, e.g. a local replay_server.py')
     parser.add_argument('--delay', type=float, default=0.5, help='Delay between requests in seconds')
+    parser.add_argument('--discovery', choices=['listing', 'sitemap'], default='listing',
+                        help='Find products by paginating brand listings or from the sitemaps in robots.txt')
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync', help='Fetch engine to use')
+    parser.add_argument('--transport', choices=TRANSPORTS, default='requests',
+                        help='HTTP client of the sync engine; httpx multiplexes requests over HTTP/2')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum concurrent requests for the async engine')
+    parser.add_argument('--workers', type=int, default=1, help='Thread pool size for fetching product pages')
+    parser.add_argument('--rate', type=float, help='Requests per second per host (default: 1/delay with --workers)')
+    parser.add_argument('--burst', type=int, default=1, help='Token bucket burst size for --rate')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adapt the request rate per host to the server: faster while healthy, slower on 429/503')
+    parser.add_argument('--max-rate', type=float, default=DEFAULT_MAX_RATE,
+                        help='Upper bound in requests per second for --adaptive')
+    parser.add_argument('--breaker-threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help='Consecutive failures after which a host or brand section fails fast (0 to disable)')
+    parser.add_argument('--breaker-reset', type=float, default=DEFAULT_RESET_TIMEOUT,
+                        help='Seconds an open circuit fails fast before a probe request is let through')
+    parser.add_argument('--parse-workers', type=int, default=1,
+                        help='Worker processes extracting product pages (1 extracts in-process)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser', help='HTML parser backend')
+    parser.add_argument('--since', type=str,
+                        help='Previous output file; products already in it are carried over instead of re-fetched')
+    parser.add_argument('--cache', type=str, help='On-disk HTTP cache file (SQLite), shared between runs')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024,
+                        help='Cache size cap in MB; least recently used pages are evicted')
+    parser.add_argument('--cache-ttl', type=float,
+                        help='Serve cached pages younger than this many seconds without revalidating')
+    parser.add_argument('--checkpoint', type=str,
+                        help='Crawl journal file (default: <output>.checkpoint.sqlite3); deleted after a complete run')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not journal crawl progress')
+    parser.add_argument('--memo-pages', type=int, default=DEFAULT_MAX_PAGES,
+                        help='Homepage and first listing pages kept in memory for reuse within the run (0 to disable)')
+    parser.add_argument('--no-brand-probe', action='store_true',
+                        help='Crawl every known brand without first probing whether its listing exists')
+    parser.add_argument('--brand-cache', type=str, help='JSON file keeping brand probe results between runs')
+    parser.add_argument('--brand-cache-ttl', type=float, default=DEFAULT_PROBE_TTL,
+                        help='Seconds a cached brand probe result stays valid')
+    parser.add_argument('--visited', type=str, metavar='FILE',
+                        help='IDs of products scraped by earlier runs, skipped in this one; updated after the run')
+    parser.add_argument('--visited-mode', choices=VISITED_MODES, default='bitmap',
+                        help='How a new --visited file stores IDs: exact bitmap, or fixed-size Bloom filter')
+    parser.add_argument('--visited-capacity', type=int, default=DEFAULT_BLOOM_CAPACITY,
+                        help='IDs a new bloom --visited file is sized for (0.1%% false positives at capacity)')
+    parser.add_argument('--archive', type=str, metavar='FILE',
+                        help='Append every page the crawl uses to this compressed archive (e.g. crawl.warc.gz)')
+    parser.add_argument('--metrics-json', type=str, metavar='FILE', help='Write a JSON summary of crawl metrics')
+    parser.add_argument('--metrics-prom', type=str, metavar='FILE',
+                        help='Write crawl metrics in the Prometheus text format (e.g. for a textfile collector)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted crawl from its checkpoint, with the same page range and brand')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                        help='Minimum level of log messages')
+    parser.add_argument('--log-file', type=str, default=DEFAULT_LOG_FILE,
+                        help='Log file to append to ("" to log to the console only)')
+    parser.add_argument('--log-json', action='store_true', help='Write log lines as JSON objects')
+    parser.add_argument('--log-sample-rate', type=float, default=1.0,
+                        help='Fraction of URLs whose per-URL info messages are logged (warnings always are)')
+    parser.add_argument('--replay', type=str, metavar='CORPUS',
+                        help='Crawl a stored page corpus served by a local replay server instead of --base-url')
+    parser.add_argument('--profile', type=str, metavar='FILE',
+                        help='Profile the crawl into FILE, with a per-stage summary in FILE.txt')
+    parser.add_argument('--profile-mode', choices=PROFILE_MODES, default='cprofile',
+                        help='cprofile: every call in the main thread; sample: cheap stack sampling of all threads')
+    parser.add_argument('--profile-rate', type=float, default=1.0,
+                        help='Fraction of runs that are profiled, e.g. 0.05 to sample production runs')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL * 1000,
+                        help='Milliseconds between stack samples in sample mode')
     
     args = parser.parse_args()
+    configure_logging(level=args.log_level, log_file=args.log_file or None, json_format=args.log_json,
+                      url_sample_rate=args.log_sample_rate)
     
     # Validate arguments
-    if not args.all and not args.pages and not args.brand:
+    if not args.all and not args.pages and not args.brand and not args.resume:
         print("Error: You must specify either --all, --pages, or --brand")
         sys.exit(1)
+    if args.output == '-' and args.format != 'jsonl':
+        print("Error: Writing to stdout requires --format jsonl")
+        sys.exit(1)
+    if args.finalize_json and (args.format != 'jsonl' or args.output == '-'):
+        print("Error: --finalize-json requires --format jsonl with an output file")
+        sys.exit(1)
+    if args.pages and args.discovery == 'sitemap':
+        print("Error: --pages only applies to --discovery listing")
+        sys.exit(1)
+    if args.transport != 'requests' and args.engine == 'async':
+        print("Error: --transport applies to the sync engine; the async engine always uses aiohttp")
+        sys.exit(1)
+    try:
+        check_transport(args.transport)
+        if args.format in COLUMNAR_FORMATS:
+            check_columnar(args.format)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
-    # Initialize scraper
-    scraper = AristoHKScraper(delay=args.delay)
+    checkpoint_path = None
+    if not args.no_checkpoint:
+        checkpoint_path = args.checkpoint or (f"{args.output}.checkpoint.sqlite3" if args.output != '-' else None)
+    if args.resume and not (checkpoint_path and os.path.exists(checkpoint_path)):
+        print("Error: --resume needs an existing checkpoint (see --checkpoint)")
+        sys.exit(1)
+    
+    visited = None
+    if args.visited:
+        try:
+            visited = load_visited(args.visited)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if visited is None:
+            visited = make_visited(args.visited_mode, args.visited_capacity)
+        else:
+            logger.info(f"Skipping {len(visited)} products already scraped according to {args.visited}")
     
     # Determine page range
-    start_page, end_page = 1, None
+    start_page, end_page, brand, discovery = 1, None, args.brand, args.discovery
     if args.pages:
         start_page, end_page = parse_page_range(args.pages)
     
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = CrawlCheckpoint(checkpoint_path, resume=args.resume)
+        run_params = checkpoint.run_params() if args.resume else None
+        if run_params:
+            start_page, end_page, brand = run_params['start_page'], run_params['end_page'], run_params['brand']
+            discovery = run_params.get('discovery', 'listing')
+            logger.info(f"Resuming crawl from {checkpoint_path}: {checkpoint.progress()}")
+        else:
+            checkpoint.set_run_params({'start_page': start_page, 'end_page': end_page, 'brand': brand,
+                                       'discovery': discovery})
+    
+    # Keep progress messages off stdout when products are streamed there
+    report = sys.stderr if args.output == '-' else sys.stdout
+    sink = None
+    if args.format == 'jsonl':
+        sink = JsonLinesWriter(args.output)
+    elif args.format in COLUMNAR_FORMATS:
+        sink = ColumnarWriter(args.output, args.format)
+    
+    cache = None
+    if args.cache:
+        cache = HttpCache(args.cache, max_bytes=int(args.cache_max_mb * 1024 * 1024), ttl=args.cache_ttl)
+    
+    previous_products = load_snapshot(args.since) if args.since else None
+    brand_cache = BrandProbeCache(args.brand_cache, ttl=args.brand_cache_ttl)
+    archive = PageArchive(args.archive, writable=True) if args.archive else None
+    breakers = None
+    if args.breaker_threshold > 0:
+        breakers = CircuitBreakers(args.breaker_threshold, args.breaker_reset)
+    
+    # Initialize scraper
+    base_url = args.base_url.rstrip('/')
+    replay_server = None
+    if args.replay:
+        # Imported here: the replay server is a benchmarking tool, not needed for real crawls
+        from replay_server import serve_corpus
+        replay_server = serve_corpus(args.replay)
+        base_url = replay_server.base_url
+        logger.info(f"Replaying {len(replay_server.routes)} stored pages from {args.replay} at {base_url}")
+    if args.engine == 'async':
+        scraper = AsyncAristoHKScraper(base_url=base_url, delay=args.delay, concurrency=args.concurrency,
+                                       parser=args.parser, cache=cache, previous_products=previous_products,
+                                       sink=sink, checkpoint=checkpoint, memo_pages=args.memo_pages,
+                                       probe_brands=not args.no_brand_probe, brand_cache=brand_cache,
+                                       parse_workers=args.parse_workers, archive=archive,
+                                       adaptive=args.adaptive, max_rate=args.max_rate, breakers=breakers,
+                                       known_ids=visited)
+    else:
+        scraper = AristoHKScraper(base_url=base_url, delay=args.delay, workers=args.workers, rate=args.rate,
+                                  burst=args.burst, parser=args.parser, cache=cache,
+                                  previous_products=previous_products, sink=sink, checkpoint=checkpoint,
+                                  memo_pages=args.memo_pages, probe_brands=not args.no_brand_probe,
+                                  brand_cache=brand_cache, parse_workers=args.parse_workers, archive=archive,
+                                  transport=args.transport, adaptive=args.adaptive, max_rate=args.max_rate,
+                                  breakers=breakers, known_ids=visited)
+    
+    profile = None
+    if args.profile and random.random() < args.profile_rate:
+        profile = make_profile(args.profile_mode, args.profile_interval / 1000)
+        profile.start()
+    
     # Start scraping
     try:
-        products = scraper.scrape_all(start_page, end_page, args.brand)
+        if discovery == 'sitemap':
+            products = scraper.scrape_sitemap(brand)
+        else:
+            products = scraper.scrape_all(start_page, end_page, brand)
         
         # Save results
-        scraper.save_to_json(products, args.output)
+        if sink:
+            sink.close()
+            if args.finalize_json:
+                jsonl_to_json(args.output, args.finalize_json)
+                logger.info(f"Saved {scraper.product_count} products to {args.finalize_json}")
+        else:
+            scraper.save_to_json(products, args.output)
+        if checkpoint:
+            if scraper.metrics.short_circuits:
+                # Pages skipped by an open circuit are journaled as failed, for --resume
+                checkpoint.close()
+                print(f"Pages skipped on open circuits; rerun with --resume to fetch them ({checkpoint_path})",
+                      file=report)
+            else:
+                checkpoint.discard()
+        if args.visited:
+            # Only products actually scraped are remembered, so failed pages are tried again next time
+            history = load_visited(args.visited) or make_visited(args.visited_mode, args.visited_capacity)
+            history.update(scraper.scraped_ids)
+            save_visited(history, args.visited)
+            logger.info(f"Remembered {len(history)} scraped product IDs in {args.visited}")
         
-        print(f"\nScraping completed successfully!")
-        print(f"Total products scraped: {len(products)}")
-        print(f"Results saved to: {args.output}")
+        print(f"\nScraping completed successfully!", file=report)
+        print(f"Total products scraped: {scraper.product_count}", file=report)
+        print(f"Results saved to: {args.output}", file=report)
         
     except KeyboardInterrupt:
-        print("\nScraping interrupted by user")
-        if scraper.scraped_products:
+        print("\nScraping interrupted by user", file=report)
+        if sink:
+            sink.close()
+            print(f"Partial results already written to: {args.output}", file=report)
+        elif scraper.scraped_products:
             scraper.save_to_json(scraper.scraped_products, f"partial_{args.output}")
             print(f"Partial results saved to: partial_{args.output}")
+        if checkpoint:
+            checkpoint.close()
+            print(f"Progress saved to {checkpoint_path}; rerun with --resume to continue", file=report)
     except Exception as e:
         logger.error(f"Error during scraping: {e}")
+        if sink:
+            # Finish the file (a Parquet footer, the Arrow batches) so the products written so far are kept
+            sink.close()
+            print(f"Partial results written to: {args.output}", file=report)
+        if checkpoint:
+            checkpoint.close()
         sys.exit(1)
+    finally:
+        if profile:
+            profile.stop()
+            print(write_profile(profile, args.profile), file=report)
+            print(f"Profile saved to: {args.profile} (summary in {args.profile}.txt)", file=report)
+        scraper.close()
+        if replay_server:
+            replay_server.shutdown()
+        if args.metrics_json:
+            scraper.metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            scraper.metrics.write_prometheus(args.metrics_prom)
 
 
 if __name__ == "__main__":
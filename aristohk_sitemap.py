@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Sitemap reading for sitemap-driven product discovery.
+
+robots.txt names the site's sitemaps (falling back to /sitemap.xml). Each
+sitemap is parsed incrementally as its body streams in, whether it is plain
+XML or gzip'd, so large sitemaps are never held in memory as a whole. A
+sitemap index yields nested sitemaps to read next; a URL set yields
+(loc, lastmod) entries.
+"""
+
+import zlib
+from datetime import datetime
+from typing import List, Optional, Tuple
+from xml.etree import ElementTree
+
+SITEMAP_CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def sitemaps_from_robots(robots_txt: str) -> List[str]:
+    """Return the sitemap URLs declared in a robots.txt file."""
+    sitemaps = []
+    for line in robots_txt.splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime lastmod as naive local time, like the scraped_at field."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+class SitemapParser:
+    """Incremental parser for one sitemap or sitemap index, plain or gzip'd."""
+
+    def __init__(self):
+        self.sitemaps: List[str] = []
+        self._parser = ElementTree.XMLPullParser(events=('end',))
+        self._decompressor = None
+        self._started = False
+
+    def _entries(self) -> List[Tuple[str, Optional[datetime]]]:
+        entries = []
+        for _, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if name not in ('url', 'sitemap'):
+                continue
+
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in element}
+            loc = fields.get('loc')
+            if loc:
+                if name == 'sitemap':
+                    self.sitemaps.append(loc)
+                else:
+                    entries.append((loc, parse_lastmod(fields.get('lastmod'))))
+            # Entries are consumed as they complete, so drop them from the tree
+            element.clear()
+        return entries
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Optional[datetime]]]:
+        """Feed the next chunk of the body and return the URL entries it completed."""
+        if not self._started:
+            self._started = True
+            if chunk.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor:
+            chunk = self._decompressor.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._entries()
+
+    def close(self) -> List[Tuple[str, Optional[datetime]]]:
+        """Finish parsing and return any remaining URL entries."""
+        if self._decompressor:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        return self._entries()
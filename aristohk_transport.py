@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+HTTP transports for the synchronous scraper.
+
+    requests  requests.Session over urllib3, HTTP/1.1 (default)
+    httpx     httpx.Client with HTTP/2, so concurrent requests to a host share
+              one multiplexed connection instead of opening one each (needs
+              `pip install httpx[http2]`; HTTPS only, plain http stays on 1.1)
+
+create_session() returns an object with the subset of the requests.Session
+API the scraper uses (headers, get(), close()), with the connection pool sized
+to the number of threads that fetch concurrently; the httpx session raises
+requests' exception types so retry handling is shared.
+
+Both transports ask for compressed bodies (br when the brotli package is
+installed, gzip otherwise) and decode them transparently. wire_bytes() tells
+how many body bytes actually crossed the network, so metrics can compare
+them with the decoded size.
+
+The async engine keeps aiohttp (HTTP/1.1, pool capped at --concurrency) but
+sends the same Accept-Encoding; aiohttp_wire_bytes() estimates its wire size.
+"""
+
+from typing import Iterator, Mapping, Optional
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # Only required by the httpx transport
+    httpx = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # Without it responses are requested gzip-only
+        brotli = None
+
+TRANSPORTS = ['requests', 'httpx']
+ACCEPT_ENCODING = 'br, gzip' if brotli else 'gzip'
+
+
+def check_transport(transport: str):
+    """Raise if a transport is unknown or its library is not installed."""
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{transport}' (choose from {', '.join(TRANSPORTS)})")
+    if transport == 'httpx':
+        if httpx is None:
+            raise ImportError("The httpx transport requires httpx (pip install 'httpx[http2]')")
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError("The httpx transport requires HTTP/2 support (pip install 'httpx[http2]')")
+
+
+def _requests_error(error: 'httpx.HTTPError') -> requests.exceptions.RequestException:
+    """Translate an httpx error into the requests exception the scraper handles."""
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(error))
+    return requests.exceptions.ConnectionError(str(error))
+
+
+def wire_bytes(response) -> Optional[int]:
+    """Body bytes a response has read from the network so far, before decoding; None if unknown."""
+    if isinstance(response, HttpxResponse):
+        return response.response.num_bytes_downloaded
+    try:
+        return response.raw.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+def aiohttp_wire_bytes(response) -> Optional[int]:
+    """Transferred size of a compressed aiohttp response from its Content-Length; None if not compressed or unknown.
+
+    aiohttp does not expose the bytes it read before decoding, so chunked compressed responses count at their
+    decoded size.
+    """
+    if response.headers.get('Content-Encoding'):
+        return response.content_length
+    return None
+
+
+class HttpxResponse:
+    """An httpx response behind the requests.Response attributes the scraper reads."""
+
+    def __init__(self, response: 'httpx.Response'):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        try:
+            return self.response.read()
+        except httpx.HTTPError as e:
+            raise _requests_error(e)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self.response.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise _requests_error(e)
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class HttpxSession:
+    """HTTP/2 client with a requests.Session-like get()."""
+
+    def __init__(self, pool_size: int):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=limits, follow_redirects=True)
+        self.headers = self.client.headers
+
+    def get(self, url: str, timeout: float = 30, headers: Mapping[str, str] = None,
+            stream: bool = False) -> HttpxResponse:
+        try:
+            request = self.client.build_request('GET', url, headers=headers, timeout=timeout)
+            response = self.client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise _requests_error(e)
+        return HttpxResponse(response)
+
+    def close(self):
+        self.client.close()
+
+
+def create_session(transport: str = 'requests', pool_size: int = 10):
+    """Create a session for `transport` keeping up to `pool_size` connections per host."""
+    check_transport(transport)
+    if transport == 'httpx':
+        session = HttpxSession(pool_size)
+    else:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': ACCEPT_ENCODING})
+    return session
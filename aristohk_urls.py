@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+URL helpers shared by the scraper, the HTTP cache, the page memo, the page
+archive and the visited-ID sets.
+
+    canonical_url        one spelling per page, for keying caches and indexes
+    product_id_from_url  the numeric ID a product URL ends with
+"""
+
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so equivalent spellings share one cache entry."""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parsed.path or '/', '', query, ''))
+
+
+def product_id_from_url(url: str) -> Optional[int]:
+    """Return the numeric product ID a product URL ends with, e.g. 18692 for /rolex/126500-ln-0002/18692."""
+    match = re.search(r'/(\d+)/?$', urlparse(url).path)
+    return int(match.group(1)) if match else None
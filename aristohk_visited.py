@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compact sets of product IDs for deduplicating and remembering products.
+
+Every product URL ends in a numeric ID (see aristohk_urls.product_id_from_url),
+so products are tracked by that integer rather than by href: two hrefs of the
+same product collapse to one entry, and an entry costs a bit instead of a
+string.
+
+    bitmap  IdBitmap, exact; one bit per ID up to the largest seen, so
+            500,000 IDs below 4,000,000 take 500 KB
+            (plus up to half again while it grows)
+    bloom   IdBloomFilter, fixed size for `capacity` IDs whatever their
+            values; with probability `error_rate` an unseen ID is reported as
+            seen (and its product skipped), never the other way round
+
+Both can be saved to and loaded from a file, to carry the IDs of earlier runs
+over to the next one.
+"""
+
+import hashlib
+import json
+import math
+import os
+import zlib
+from typing import Iterable, Optional, Set, Union
+
+VISITED_MODES = ['bitmap', 'bloom']
+DEFAULT_BLOOM_CAPACITY = 1_000_000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+# IDs beyond this would grow the bitmap past 32 MB; they are kept in a plain set instead
+MAX_BITMAP_ID = 1 << 28
+_MAGIC = b'AHKIDS1\n'
+
+
+class IdBitmap:
+    """Exact set of non-negative integer IDs, one bit per possible ID."""
+
+    mode = 'bitmap'
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.count = 0
+        self.overflow: Set[int] = set()
+
+    def add(self, item_id: int) -> bool:
+        """Add an ID, returning False if it was already there."""
+        if item_id >= MAX_BITMAP_ID:
+            if item_id in self.overflow:
+                return False
+            self.overflow.add(item_id)
+            return True
+        index, mask = item_id >> 3, 1 << (item_id & 7)
+        if index >= len(self.bits):
+            # Grow geometrically so a crawl in ascending ID order does not reallocate per product
+            self.bits.extend(bytes(max(index + 1 - len(self.bits), len(self.bits) // 2)))
+        if self.bits[index] & mask:
+            return False
+        self.bits[index] |= mask
+        self.count += 1
+        return True
+
+    def update(self, item_ids: Iterable[int]):
+        for item_id in item_ids:
+            self.add(item_id)
+
+    def __contains__(self, item_id: int) -> bool:
+        if item_id >= MAX_BITMAP_ID:
+            return item_id in self.overflow
+        index = item_id >> 3
+        return index < len(self.bits) and bool(self.bits[index] & (1 << (item_id & 7)))
+
+    def __iter__(self):
+        for index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (index << 3) | bit
+        yield from sorted(self.overflow)
+
+    def __len__(self) -> int:
+        return self.count + len(self.overflow)
+
+    def clear(self):
+        self.bits = bytearray()
+        self.count = 0
+        self.overflow.clear()
+
+    def _header(self) -> dict:
+        return {'overflow': sorted(self.overflow)}
+
+    def _payload(self) -> bytes:
+        return bytes(self.bits)
+
+    @classmethod
+    def _restore(cls, header: dict, payload: bytes) -> 'IdBitmap':
+        bitmap = cls()
+        bitmap.bits = bytearray(payload)
+        bitmap.overflow = set(header.get('overflow', []))
+        bitmap.count = header['ids'] - len(bitmap.overflow)
+        return bitmap
+
+
+class IdBloomFilter:
+    """Bloom filter over integer IDs: fixed memory, no false negatives, rare false positives."""
+
+    mode = 'bloom'
+
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = size
+        self.hashes = max(1, round(size / self.capacity * math.log(2)))
+        self.bits = bytearray((size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item_id: int):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item_id.to_bytes(16, 'little', signed=True), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item_id: int) -> bool:
+        """Add an ID, returning False if it (probably) was already there."""
+        new = False
+        for position in self._positions(item_id):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def update(self, item_ids: Iterable[int]):
+        for item_id in item_ids:
+            self.add(item_id)
+
+    def __contains__(self, item_id: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item_id))
+
+    def __len__(self) -> int:
+        """Number of IDs added (not counting those taken for already present)."""
+        return self.count
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+    def _header(self) -> dict:
+        return {'capacity': self.capacity, 'error_rate': self.error_rate}
+
+    def _payload(self) -> bytes:
+        return bytes(self.bits)
+
+    @classmethod
+    def _restore(cls, header: dict, payload: bytes) -> 'IdBloomFilter':
+        bloom = cls(header['capacity'], header['error_rate'])
+        bloom.bits = bytearray(payload)
+        bloom.count = header['ids']
+        return bloom
+
+
+VisitedIds = Union[IdBitmap, IdBloomFilter]
+
+
+def make_visited(mode: str = 'bitmap', capacity: int = DEFAULT_BLOOM_CAPACITY,
+                 error_rate: float = DEFAULT_BLOOM_ERROR_RATE) -> VisitedIds:
+    """Create an empty ID set of the given mode; capacity and error_rate only apply to bloom."""
+    if mode not in VISITED_MODES:
+        raise ValueError(f"Unknown visited mode '{mode}' (choose from {', '.join(VISITED_MODES)})")
+    if mode == 'bloom':
+        return IdBloomFilter(capacity, error_rate)
+    return IdBitmap()
+
+
+def save_visited(visited: VisitedIds, filename: str):
+    """Write an ID set atomically: a magic line, a JSON header line and the zlib-compressed bits."""
+    header = dict(visited._header(), mode=visited.mode, ids=len(visited))
+    tmp = f"{filename}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(json.dumps(header).encode('utf-8') + b'\n')
+        f.write(zlib.compress(visited._payload()))
+    os.replace(tmp, filename)
+
+
+def load_visited(filename: str) -> Optional[VisitedIds]:
+    """Read an ID set written by save_visited; None if the file does not exist.
+
+    Raises ValueError if the file is not a visited ID file or is damaged.
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'rb') as f:
+        if f.readline() != _MAGIC:
+            raise ValueError(f"{filename} is not a visited ID file")
+        try:
+            header = json.loads(f.readline())
+            payload = zlib.decompress(f.read())
+            kind = IdBloomFilter if header['mode'] == 'bloom' else IdBitmap
+            visited = kind._restore(header, payload)
+        except (ValueError, KeyError, TypeError, zlib.error) as e:
+            raise ValueError(f"{filename} is damaged ({e})") from e
+    if isinstance(visited, IdBloomFilter) and len(visited.bits) != (visited.size + 7) // 8:
+        raise ValueError(f"{filename} is damaged (bloom filter size does not match its header)")
+    return visited
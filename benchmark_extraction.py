@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Offline microbenchmarks for the extraction hot path.
+
+Runs over a stored page corpus (see aristohk_corpus), without touching the
+network, and times each stage the scraper runs on a page:
+
+    listing pages  parse, total_pages, product_urls
+    detail pages   parse, text, scanner setup, price, condition, year,
+                   completeness, reference, and the full parse_product_details
+
+Every timing is the fastest of --repeat runs. Per-page timings, per-stage
+summaries (mean, median, p95 in ms) and pages/sec are written as JSON, so
+runs can be compared over time; --baseline compares against an earlier
+result file and exits with status 2 if any stage's median got slower than
+--threshold allows.
+
+Usage:
+    python benchmark_extraction.py corpus/ --output bench.json
+    python benchmark_extraction.py corpus/ --parser lxml --baseline bench.json --output bench_lxml.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlparse
+
+from aristohk_corpus import load_corpus, page_kind
+from aristohk_fields import FieldScanner
+from aristohk_html import PARSER_BACKENDS, check_parser_backend
+from aristohk_scraper import AristoHKScraper
+
+FIELDS = ('price', 'condition', 'year', 'completeness')
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of `repeat` runs of func, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_listing(scraper: AristoHKScraper, doc, repeat: int) -> Dict[str, float]:
+    """Time the extraction steps of a listing page."""
+    def product_urls():
+        # parse_product_urls skips URLs it has seen, so start every run afresh
+        scraper.visited.clear()
+        scraper.parse_product_urls(doc)
+
+    return {
+        'total_pages': best_time(lambda: scraper.parse_total_pages(doc), repeat),
+        'product_urls': best_time(product_urls, repeat),
+    }
+
+
+def bench_detail(url: str, doc, repeat: int) -> Dict[str, float]:
+    """Time each field of a detail page separately, then the whole extraction."""
+    text = doc.text()
+    timings = {
+        'text': best_time(doc.text, repeat),
+        'scanner': best_time(lambda: FieldScanner(text), repeat),
+    }
+    # Each field gets a fresh scanner so keyword hits cached by another field don't flatter it
+    for field in FIELDS:
+        scanners = [FieldScanner(text) for _ in range(repeat)]
+        timings[field] = best_time(lambda: getattr(scanners.pop(), field)(), repeat)
+
+    brand = AristoHKScraper.parse_product_brand(url)
+    timings['reference'] = best_time(lambda: AristoHKScraper.parse_product_reference(url, brand, doc), repeat)
+    timings['extract'] = best_time(lambda: AristoHKScraper.parse_product_details(url, doc), repeat)
+    return timings
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Summarize timings in milliseconds."""
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'mean_ms': round(statistics.mean(ordered) * 1000, 4),
+        'median_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(p95 * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4),
+    }
+
+
+def run_benchmark(pages: List[Tuple[str, bytes]], parser: str, repeat: int) -> Dict:
+    """Benchmark every listing and detail page of a corpus with one parser backend."""
+    per_page = []
+    stages: Dict[str, Dict[str, List[float]]] = {'listing': {}, 'detail': {}}
+    page_seconds = {'listing': 0.0, 'detail': 0.0}
+
+    for url, content in pages:
+        kind = page_kind(url)
+        if kind == 'home':
+            continue
+        parsed = urlparse(url)
+        scraper = AristoHKScraper(base_url=f"{parsed.scheme}://{parsed.netloc}", delay=0, parser=parser)
+
+        timings = {'parse': best_time(lambda: scraper.parse_html(content), repeat)}
+        doc = scraper.parse_html(content)
+        if kind == 'listing':
+            timings.update(bench_listing(scraper, doc, repeat))
+            page_seconds[kind] += timings['parse'] + timings['total_pages'] + timings['product_urls']
+        else:
+            timings.update(bench_detail(url, doc, repeat))
+            page_seconds[kind] += timings['parse'] + timings['extract']
+
+        for stage, seconds in timings.items():
+            stages[kind].setdefault(stage, []).append(seconds)
+        per_page.append({
+            'url': url,
+            'kind': kind,
+            'bytes': len(content),
+            'timings_ms': {stage: round(seconds * 1000, 4) for stage, seconds in timings.items()},
+        })
+
+    summary = {}
+    for kind, kind_stages in stages.items():
+        count = len(kind_stages.get('parse', []))
+        if not count:
+            continue
+        summary[kind] = {
+            'pages': count,
+            'pages_per_second': round(count / page_seconds[kind], 1) if page_seconds[kind] else 0.0,
+            'stages': {stage: summarize(values) for stage, values in kind_stages.items()},
+        }
+
+    return {
+        'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'parser': parser,
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'summary': summary,
+        'pages': per_page,
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """List the stages whose median is more than `threshold` times the baseline's."""
+    regressions = []
+    for kind, kind_summary in results['summary'].items():
+        baseline_stages = baseline.get('summary', {}).get(kind, {}).get('stages', {})
+        for stage, stats in kind_summary['stages'].items():
+            before = baseline_stages.get(stage, {}).get('median_ms')
+            if before and stats['median_ms'] > before * threshold:
+                regressions.append(f"{kind}.{stage}: {before} ms -> {stats['median_ms']} ms "
+                                   f"({stats['median_ms'] / before:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction over stored pages')
+    parser.add_argument('corpus', help='Corpus directory (HTML files plus index.json)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser', help='HTML parser backend')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the fastest is kept')
+    parser.add_argument('--output', type=str, help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', type=str, help='Earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown factor of a stage median that counts as a regression')
+
+    args = parser.parse_args()
+    logging.getLogger('aristohk_scraper').setLevel(logging.WARNING)
+
+    try:
+        check_parser_backend(args.parser)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    pages = load_corpus(args.corpus)
+    if not any(page_kind(url) != 'home' for url, _ in pages):
+        print("Nothing to benchmark")
+        sys.exit(1)
+
+    results = run_benchmark(pages, args.parser, max(1, args.repeat))
+
+    for kind, kind_summary in results['summary'].items():
+        print(f"\n{kind} pages: {kind_summary['pages']} ({kind_summary['pages_per_second']} pages/s, "
+              f"parser: {args.parser})")
+        print("-" * 56)
+        print(f"{'stage':<16}{'mean ms':>10}{'median ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for stage, stats in kind_summary['stages'].items():
+            print(f"{stage:<16}{stats['mean_ms']:>10}{stats['median_ms']:>10}{stats['p95_ms']:>10}{stats['max_ms']:>10}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(2)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Compare the HTML parser backends on a stored page corpus.
+
+For every backend, parses each page, times the parse and runs the same
+extraction the scraper would (brand discovery, pagination + product URLs,
+or product details). Extraction results must be identical across backends;
+any difference is reported as a mismatch.
+
+Usage:
+    python compare_parsers.py corpus/ --record https://aristohk.com/rolex https://aristohk.com/rolex/126500-ln-0002/18692
+    python compare_parsers.py corpus/ --repeat 5 --output parser_comparison.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+from aristohk_corpus import load_corpus, page_kind, save_corpus
+from aristohk_html import PARSER_BACKENDS, check_parser_backend
+from aristohk_scraper import AristoHKScraper
+
+TIMESTAMP_FIELDS = ('scraped_at', 'created')
+
+
+def extract(scraper: AristoHKScraper, url: str, doc) -> object:
+    """Run the extraction the scraper performs for this kind of page."""
+    kind = page_kind(url)
+    if kind == 'home':
+        return scraper.parse_brands(doc)
+    if kind == 'listing':
+        return {
+            'total_pages': scraper.parse_total_pages(doc),
+            'product_urls': scraper.parse_product_urls(doc)
+        }
+    product = scraper.parse_product_details(url, doc)
+    if product:
+        product = {k: v for k, v in product.items() if k not in TIMESTAMP_FIELDS}
+    return product
+
+
+def compare_backends(pages: List[Tuple[str, bytes]], backends: List[str], repeat: int = 3) -> Dict:
+    """Time each backend on every page and check extraction results agree."""
+    results = {}
+    reference = None
+
+    for backend in backends:
+        parse_times = []
+        extracted = []
+        scraper = AristoHKScraper(delay=0, parser=backend)
+        try:
+            for url, content in pages:
+                # Extract every page on its own: against its own site, with no product links seen before
+                parsed = urlparse(url)
+                scraper.base_url = f"{parsed.scheme}://{parsed.netloc}"
+                scraper.visited.clear()
+                scraper.visited_hrefs.clear()
+
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    doc = scraper.parse_html(content)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                parse_times.append(best)
+                extracted.append(extract(scraper, url, doc))
+        finally:
+            scraper.close()
+
+        if reference is None:
+            reference = extracted
+        mismatches = [url for (url, _), got, expected in zip(pages, extracted, reference) if got != expected]
+
+        total = sum(parse_times)
+        results[backend] = {
+            'pages': len(pages),
+            'total_parse_seconds': round(total, 6),
+            'mean_parse_ms': round(total / len(pages) * 1000, 3) if pages else 0.0,
+            'max_parse_ms': round(max(parse_times) * 1000, 3) if pages else 0.0,
+            'pages_per_second': round(len(pages) / total, 1) if total else 0.0,
+            'mismatches': mismatches
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends on stored pages')
+    parser.add_argument('corpus', help='Corpus directory (HTML files plus index.json)')
+    parser.add_argument('--backends', nargs='+', default=PARSER_BACKENDS, help='Backends to compare')
+    parser.add_argument('--repeat', type=int, default=3, help='Parses per page; the fastest is kept')
+    parser.add_argument('--output', type=str, help='Write the comparison as JSON to this file')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='Fetch these URLs into the corpus first')
+
+    args = parser.parse_args()
+    logging.getLogger('aristohk_scraper').setLevel(logging.WARNING)
+
+    if args.record:
+        scraper = AristoHKScraper()
+        try:
+            fetched = [(url, scraper.fetch_content(url)) for url in args.record]
+        finally:
+            scraper.close()
+        saved = save_corpus(args.corpus, [(url, content) for url, content in fetched if content is not None])
+        print(f"Recorded {saved} pages into {args.corpus}")
+
+    available = []
+    for backend in args.backends:
+        try:
+            check_parser_backend(backend)
+            available.append(backend)
+        except (ImportError, ValueError) as e:
+            print(f"Skipping {backend}: {e}")
+
+    pages = load_corpus(args.corpus)
+    if not pages or not available:
+        print("Nothing to compare")
+        sys.exit(1)
+
+    results = compare_backends(pages, available, args.repeat)
+
+    print(f"\nParser comparison over {len(pages)} pages (reference: {available[0]})")
+    print("-" * 72)
+    print(f"{'backend':<14}{'mean ms':>10}{'max ms':>10}{'pages/s':>10}{'total s':>10}{'mismatches':>14}")
+    for backend, stats in results.items():
+        print(f"{backend:<14}{stats['mean_parse_ms']:>10}{stats['max_parse_ms']:>10}"
+              f"{stats['pages_per_second']:>10}{stats['total_parse_seconds']:>10}{len(stats['mismatches']):>14}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+    if any(stats['mismatches'] for stats in results.values()):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Re-run product extraction over stored pages, without touching the network.
+
+Reads the product pages of a corpus directory (see aristohk_corpus) or of a
+crawl archive written with --archive (see aristohk_archive), extracts them
+with the current parse_product_details on every core, and writes a fresh
+product file. With --previous, the new products are compared field by field
+against an earlier output (e.g. improved_response.json) and the differences
+are summarized per field and, with --diff, written out in full.
+
+The scraped_at and created timestamps are those of the re-extraction and are
+left out of the comparison.
+
+Usage:
+    python reextract.py crawl.warc.gz --output watches.json --previous improved_response.json --diff diff.json
+    python reextract.py corpus/ --workers 4 --parser lxml --output watches.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aristohk_archive import PageArchive
+from aristohk_columnar import COLUMNAR_FORMATS, ColumnarWriter, check_columnar
+from aristohk_corpus import load_corpus, page_kind
+from aristohk_html import PARSER_BACKENDS, check_parser_backend
+from aristohk_output import OUTPUT_FORMATS, JsonLinesWriter, ProductSink, load_products
+from aristohk_record import json_default
+from aristohk_scraper import extract_product
+from aristohk_urls import product_id_from_url
+
+TIMESTAMP_FIELDS = ('scraped_at', 'created')
+CHUNK_SIZE = 16
+
+
+def load_pages(source: str) -> List[Tuple[str, bytes]]:
+    """Load the product pages of a corpus directory or an archive file."""
+    if os.path.isdir(source):
+        pages = load_corpus(source)
+    else:
+        archive = PageArchive(source)
+        pages = list(archive.pages())
+        archive.close()
+    return [(url, content) for url, content in pages if page_kind(url) == 'detail']
+
+
+def reextract(pages: List[Tuple[str, bytes]], parser: str = 'html.parser', workers: int = 1) -> List[Dict]:
+    """Extract every page, in worker processes when workers > 1; pages that fail are skipped."""
+    extract = partial(extract_product, parser=parser)
+    urls = [url for url, _ in pages]
+    contents = [content for _, content in pages]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            products = list(executor.map(extract, urls, contents, chunksize=CHUNK_SIZE))
+    else:
+        products = list(map(extract, urls, contents))
+    return [product for product in products if product]
+
+
+def diff_products(products: Iterable[Dict], previous: Iterable[Dict]) -> Dict:
+    """Compare products with an earlier output by product ID, field by field."""
+    def by_id(items: Iterable[Dict]) -> Dict[Optional[int], Dict]:
+        return {product_id_from_url(item.get('product_url', '')): item for item in items}
+
+    new, old = by_id(products), by_id(previous)
+    changes = []
+    changed_fields: Dict[str, int] = {}
+    for product_id in sorted(set(new) & set(old), key=str):
+        for field in sorted(set(new[product_id]) | set(old[product_id])):
+            if field in TIMESTAMP_FIELDS:
+                continue
+            before, after = old[product_id].get(field), new[product_id].get(field)
+            if before != after:
+                changed_fields[field] = changed_fields.get(field, 0) + 1
+                changes.append({'id': product_id, 'product_url': new[product_id].get('product_url'),
+                                'field': field, 'old': before, 'new': after})
+
+    return {
+        'products': len(new),
+        'previous': len(old),
+        'added': sorted((key for key in set(new) - set(old)), key=str),
+        'removed': sorted((key for key in set(old) - set(new)), key=str),
+        'changed_products': len({change['id'] for change in changes}),
+        'changed_fields': dict(sorted(changed_fields.items(), key=lambda item: -item[1])),
+        'changes': changes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-extract products from stored pages')
+    parser.add_argument('source', help='Corpus directory or page archive (.warc.gz written with --archive)')
+    parser.add_argument('--output', type=str, default='aristohk_products.json', help='Output filename')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS + COLUMNAR_FORMATS, default='json', help='Output format')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser', help='HTML parser backend')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Extraction worker processes (default: one per core)')
+    parser.add_argument('--previous', type=str, help='Earlier output to compare the new products against')
+    parser.add_argument('--diff', type=str, metavar='FILE', help='With --previous, write every difference as JSON')
+
+    args = parser.parse_args()
+    logging.getLogger('aristohk_scraper').setLevel(logging.WARNING)
+
+    try:
+        check_parser_backend(args.parser)
+        if args.format in COLUMNAR_FORMATS:
+            check_columnar(args.format)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} does not exist")
+        sys.exit(1)
+    if args.diff and not args.previous:
+        print("Error: --diff requires --previous")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    pages = load_pages(args.source)
+    if not pages:
+        print(f"No product pages in {args.source}")
+        sys.exit(1)
+    products = reextract(pages, args.parser, max(1, args.workers))
+    elapsed = time.perf_counter() - started
+
+    if args.format == 'jsonl' or args.format in COLUMNAR_FORMATS:
+        writer: ProductSink = (JsonLinesWriter(args.output) if args.format == 'jsonl'
+                               else ColumnarWriter(args.output, args.format))
+        for product in products:
+            writer.write(product)
+        writer.close()
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(products, f, indent=2, ensure_ascii=False, default=json_default)
+    print(f"Re-extracted {len(products)} products from {len(pages)} pages in {elapsed:.2f}s "
+          f"({len(pages) / elapsed:.0f} pages/s, {max(1, args.workers)} workers)")
+    print(f"Results saved to: {args.output}")
+
+    if args.previous:
+        diff = diff_products(products, load_products(args.previous))
+        print(f"\nCompared with {args.previous}: {diff['products']} products now, {diff['previous']} before, "
+              f"{len(diff['added'])} added, {len(diff['removed'])} removed, {diff['changed_products']} changed")
+        if diff['changed_fields']:
+            print("-" * 40)
+            print(f"{'field':<24}{'changed':>16}")
+            for field, count in diff['changed_fields'].items():
+                print(f"{field:<24}{count:>16}")
+        if args.diff:
+            with open(args.diff, 'w', encoding='utf-8') as f:
+                json.dump(diff, f, indent=2, ensure_ascii=False)
+            print(f"\nDiff saved to: {args.diff}")
+
+
+if __name__ == "__main__":
+    main()
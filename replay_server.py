@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for aristohk.com that replays a stored page corpus.
+
+Serves the recorded homepage, brand listings (including ?page=N) and product
+pages under the same paths as the live site, so the scraper can be pointed at
+it with --base-url and whole crawls benchmarked without touching the real
+site. Links to the recorded host are rewritten to relative ones so the
+scraper never leaves the replay server.
+
+Slow or flaky production behaviour can be reproduced with added latency and
+jitter, random 500 errors and 429 Too Many Requests responses. The random
+choices are derived from --seed, the path and how often that path was
+requested, so a run with the same settings sees the same failures.
+
+Like the live site, responses are compressed with br or gzip when the client
+accepts it (br needs the brotli package), unless --no-compress is given.
+
+Usage:
+    python replay_server.py corpus/ --port 8000 --latency 150 --jitter 50
+    python replay_server.py corpus/ --port 8000 --error-rate 0.02 --throttle-rate 0.05 --retry-after 2
+    python aristohk_scraper.py --all --engine async --base-url http://127.0.0.1:8000 --delay 0 --output replay.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from aristohk_corpus import load_corpus
+
+try:
+    import brotli
+except ImportError:  # Only gzip is offered without it
+    brotli = None
+
+
+def route_key(url: str) -> str:
+    """Build the lookup key of a URL: its path (without trailing slash) plus query."""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    return f"{path}?{parsed.query}" if parsed.query else path
+
+
+def build_routes(pages: List[Tuple[str, bytes]]) -> Dict[str, bytes]:
+    """Map each recorded page to its route, making links to the recorded host relative."""
+    routes = {}
+    for url, content in pages:
+        parsed = urlparse(url)
+        for origin in (f"{parsed.scheme}://{parsed.netloc}", f"//{parsed.netloc}"):
+            content = content.replace(origin.encode(), b'')
+        routes[route_key(url)] = content
+    return routes
+
+
+class ReplayConfig:
+    """Latency and failure injection settings for the replay server."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: Optional[int] = 1, seed: int = 0, compress: bool = True):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.compress = compress
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering from recorded pages."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], routes: Dict[str, bytes], config: ReplayConfig):
+        super().__init__(address, ReplayHandler)
+        self.routes = routes
+        self.config = config
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self._requests_per_path = Counter()
+        self._encoded: Dict[Tuple[str, str], bytes] = {}
+
+    def encoded(self, key: str, encoding: str) -> bytes:
+        """Return a route's body compressed with `encoding`, compressing each route only once."""
+        with self.lock:
+            body = self._encoded.get((key, encoding))
+        if body is None:
+            content = self.routes[key]
+            body = brotli.compress(content) if encoding == 'br' else gzip.compress(content)
+            with self.lock:
+                self._encoded[(key, encoding)] = body
+        return body
+
+    def draw(self, key: str) -> random.Random:
+        """Return the random source for the next request to a path, independent of thread timing."""
+        with self.lock:
+            self._requests_per_path[key] += 1
+            attempt = self._requests_per_path[key]
+        return random.Random(f"{self.config.seed}:{key}:{attempt}")
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serve one recorded page, after the configured delay and failure draws."""
+
+    server: ReplayServer
+
+    def do_GET(self):
+        config = self.server.config
+        key = route_key(self.path)
+        rnd = self.server.draw(key)
+        self.server.count('requests')
+
+        delay = config.latency + rnd.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if rnd.random() < config.throttle_rate:
+            self.server.count('status_429')
+            headers = {'Retry-After': str(config.retry_after)} if config.retry_after is not None else {}
+            self._respond(429, b'Too Many Requests', headers)
+            return
+        if rnd.random() < config.error_rate:
+            self.server.count('status_500')
+            self._respond(500, b'Internal Server Error')
+            return
+
+        content = self.server.routes.get(key)
+        if content is None:
+            self.server.count('status_404')
+            self._respond(404, b'Not Found')
+            return
+
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.server.count('status_304')
+            self._respond(304, b'', {'ETag': etag})
+            return
+
+        headers = {'ETag': etag, 'Content-Type': 'application/xml' if '.xml' in key else 'text/html; charset=utf-8'}
+        accepted = [value.split(';')[0].strip() for value in self.headers.get('Accept-Encoding', '').split(',')]
+        encoding = None
+        if config.compress and not key.endswith('.gz'):
+            encoding = 'br' if brotli and 'br' in accepted else 'gzip' if 'gzip' in accepted else None
+        if encoding:
+            content = self.server.encoded(key, encoding)
+            headers['Content-Encoding'] = encoding
+        self.server.count('status_200')
+        self.server.count('bytes', len(content))
+        self._respond(200, content, headers)
+
+    def _respond(self, status: int, body: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep per-request logging out of throughput measurements
+        pass
+
+
+def serve_corpus(directory: str, host: str = '127.0.0.1', port: int = 0,
+                 config: ReplayConfig = None) -> ReplayServer:
+    """Start a replay server for a corpus in a background thread; port 0 picks a free port."""
+    server = ReplayServer((host, port), build_routes(load_corpus(directory)), config or ReplayConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a stored page corpus as a local aristohk.com')
+    parser.add_argument('corpus', help='Corpus directory (HTML files plus index.json)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added response latency in milliseconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- latency variation in milliseconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency and failure draws')
+    parser.add_argument('--no-compress', action='store_true', help='Never compress responses')
+
+    args = parser.parse_args()
+
+    config = ReplayConfig(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+                          throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed,
+                          compress=not args.no_compress)
+    server = ReplayServer((args.host, args.port), build_routes(load_corpus(args.corpus)), config)
+    print(f"Replaying {len(server.routes)} pages from {args.corpus} at {server.base_url}")
+
+    started = time.time()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    elapsed = time.time() - started
+    print(f"\nServed {server.stats['requests']} requests in {elapsed:.1f}s")
+    for name, value in sorted(server.stats.items()):
+        if name != 'requests':
+            print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
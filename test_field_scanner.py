@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Check FieldScanner against the regex sweeps it replaced.
+
+Runs the original price / condition / year / completeness code (full-text
+re.search passes, as parse_product_details did them before aristohk_fields)
+and FieldScanner on the same product pages and reports every field where
+they disagree.
+
+Usage:
+    python test_field_scanner.py corpus/           # a stored corpus (aristohk_corpus)
+    python test_field_scanner.py crawl.warc.gz     # an archive written with --archive
+    python test_field_scanner.py                   # fetch the products in response.json
+"""
+
+import json
+import os
+import re
+import sys
+
+import requests
+
+from aristohk_archive import PageArchive
+from aristohk_corpus import load_corpus, page_kind
+from aristohk_fields import FieldScanner
+from aristohk_html import parse_document
+
+FIELDS = ('price', 'condition', 'year', 'completeness')
+
+
+def baseline_price(all_text):
+    """HK$ price from the main product area, None for "Ask Price" products"""
+    price_hk = None
+    main_content = all_text[:1500]
+
+    hk_indices = []
+    for i, char in enumerate(main_content):
+        if main_content[i:i+3] == 'HK$':
+            hk_indices.append(i)
+
+    for idx in hk_indices:
+        price_text = main_content[idx+3:idx+20]
+        number_match = re.match(r'([\d,]+)', price_text)
+        if number_match:
+            price_str = number_match.group(1)
+            try:
+                price_num = int(price_str.replace(',', ''))
+                if price_num > 10000:
+                    surrounding_text = main_content[max(0, idx-50):idx+100]
+                    if not re.search(r'Ask Price', surrounding_text, re.I):
+                        price_hk = price_num
+                        break
+            except ValueError:
+                continue
+    return price_hk
+
+
+def baseline_condition(all_text):
+    main_content = all_text[:1500]
+    if re.search(r'HOT', main_content, re.I):
+        return "New"
+    elif re.search(r'Pre-owned', main_content, re.I):
+        return "Pre-owned"
+    return "New"
+
+
+def _first_year(patterns, all_text, latest):
+    for pattern in patterns:
+        year_match = re.search(pattern, all_text, re.I)
+        if year_match:
+            try:
+                potential_year = int(year_match.group(1))
+                if 1950 <= potential_year <= latest:
+                    return potential_year
+            except ValueError:
+                continue
+    return None
+
+
+def baseline_year(all_text):
+    structured_patterns = [
+        r'Release Year[:\s]*(\d{4})',
+        r'Release Year[:\s]*(\d{4})',
+        r'(?i)release\s*year[:\s]*(\d{4})',
+    ]
+    description_patterns = [
+        r'released in (\d{4})',
+        r'introduced in (\d{4})',
+        r'launched in (\d{4})',
+        r'this model.*?(\d{4})',
+    ]
+    contextual_patterns = [
+        r'(\d{4})\s*model',
+        r'(\d{4})\s*edition',
+        r'production[:\s]*(\d{4})',
+    ]
+    year = _first_year(structured_patterns, all_text, 2027)
+    if year is None:
+        year = _first_year(description_patterns, all_text, 2027)
+    if year is None:
+        year = _first_year(contextual_patterns, all_text, 2024)
+    return year
+
+
+def baseline_completeness(all_text):
+    completeness_parts = []
+    if re.search(r'With Box', all_text, re.I):
+        completeness_parts.append("With Box")
+    if re.search(r'With Papers?', all_text, re.I):
+        completeness_parts.append("With Papers")
+    if re.search(r'Original.*box', all_text, re.I):
+        if "With Box" not in completeness_parts:
+            completeness_parts.append("With Box")
+    if re.search(r'Original.*certificate', all_text, re.I):
+        if "With Papers" not in completeness_parts:
+            completeness_parts.append("With Papers")
+    return ", ".join(completeness_parts) if completeness_parts else ""
+
+
+def baseline_fields(all_text):
+    return {
+        'price': baseline_price(all_text),
+        'condition': baseline_condition(all_text),
+        'year': baseline_year(all_text),
+        'completeness': baseline_completeness(all_text),
+    }
+
+
+def scanner_fields(all_text):
+    fields = FieldScanner(all_text)
+    return {
+        'price': fields.price(),
+        'condition': fields.condition(),
+        'year': fields.year(),
+        'completeness': fields.completeness(),
+    }
+
+
+def load_pages(source):
+    """(url, html) of the product pages in a corpus, an archive or response.json"""
+    if source and os.path.isdir(source):
+        return [(url, content) for url, content in load_corpus(source) if page_kind(url) == 'detail']
+    if source:
+        archive = PageArchive(source)
+        pages = [(url, content) for url, content in archive.pages() if page_kind(url) == 'detail']
+        archive.close()
+        return pages
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    with open('response.json', encoding='utf-8') as f:
+        urls = [product['product_url'] for product in json.load(f)]
+    pages = []
+    for url in urls:
+        try:
+            response = requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
+            pages.append((url, response.content))
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+    return pages
+
+
+def compare(pages):
+    """Print every disagreement; return the number of pages with one"""
+    mismatched = 0
+    for url, content in pages:
+        all_text = parse_document(content).text()
+        expected = baseline_fields(all_text)
+        got = scanner_fields(all_text)
+        diffs = [field for field in FIELDS if expected[field] != got[field]]
+        if diffs:
+            mismatched += 1
+            print(f"✗ {url}")
+            for field in diffs:
+                print(f"    {field}: regex={expected[field]!r} scanner={got[field]!r}")
+    return mismatched
+
+
+if __name__ == "__main__":
+    # Optional first argument: a corpus directory or an archive written by aristohk_scraper.py --archive
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    pages = load_pages(source)
+    if not pages:
+        print("No product pages to check")
+        sys.exit(1)
+
+    mismatched = compare(pages)
+    print("=" * 60)
+    print(f"Checked {len(pages)} product pages: {len(pages) - mismatched} identical, {mismatched} different")
+    sys.exit(1 if mismatched else 0)
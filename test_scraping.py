@@ -4,6 +4,7 @@ Test scraping a few products to validate improvements
 """
 
 import json
+from aristohk_record import json_default
 from aristohk_scraper import AristoHKScraper
 
 def test_few_products():
@@ -44,7 +45,7 @@ def test_few_products():
     # Save test results
     if products:
         with open('/app/test_results.json', 'w', encoding='utf-8') as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
+            json.dump(products, f, indent=2, ensure_ascii=False, default=json_default)
         print(f"✓ Saved {len(products)} test results to test_results.json")
     
     return products
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test visited ID files (--visited): save/load round trips, and crawls that skip known products
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+
+from aristohk_corpus import save_corpus
+from aristohk_scraper import AristoHKScraper, AsyncAristoHKScraper
+from aristohk_visited import MAX_BITMAP_ID, IdBitmap, IdBloomFilter, load_visited, make_visited, save_visited
+from replay_server import serve_corpus
+
+failures = 0
+
+
+def check(name, ok):
+    global failures
+    print(f"{'✓ PASS' if ok else '✗ FAIL'}  {name}")
+    if not ok:
+        failures += 1
+
+
+def round_trip(visited, filename):
+    save_visited(visited, filename)
+    return load_visited(filename)
+
+
+def test_bitmap_round_trip(filename):
+    """Exact IDs, including ones kept in the overflow set above MAX_BITMAP_ID"""
+
+    print("Testing bitmap round trip:")
+    print("-" * 50)
+
+    ids = {0, 7, 8, 18692, 25110, MAX_BITMAP_ID - 1, MAX_BITMAP_ID, MAX_BITMAP_ID + 12345, 1 << 40}
+    ids.update(random.sample(range(4_000_000), 1000))
+    visited = make_visited('bitmap')
+    visited.update(ids)
+
+    loaded = round_trip(visited, filename)
+    check("loads as a bitmap", isinstance(loaded, IdBitmap))
+    check("same number of IDs", len(loaded) == len(ids))
+    check("same IDs", set(loaded) == ids)
+    check("IDs above 1<<28 kept", all(item_id in loaded for item_id in ids if item_id >= MAX_BITMAP_ID))
+    check("unseen IDs absent", 18693 not in loaded and MAX_BITMAP_ID + 1 not in loaded)
+    check("adding a loaded ID reports it as seen", not loaded.add(1 << 40))
+    print()
+
+
+def test_bloom_round_trip(filename):
+    """Bloom filters keep their sizing and every added ID"""
+
+    print("Testing bloom round trip:")
+    print("-" * 50)
+
+    ids = random.sample(range(1 << 32), 5000) + [MAX_BITMAP_ID + 1, 1 << 40]
+    visited = make_visited('bloom', capacity=10_000)
+    visited.update(ids)
+
+    loaded = round_trip(visited, filename)
+    check("loads as a bloom filter", isinstance(loaded, IdBloomFilter))
+    check("same capacity and error rate",
+          (loaded.capacity, loaded.error_rate) == (visited.capacity, visited.error_rate))
+    check("same bits", loaded.bits == visited.bits)
+    check("same count", len(loaded) == len(visited))
+    check("no false negatives", all(item_id in loaded for item_id in ids))
+    print()
+
+
+def test_bad_files(filename):
+    """Foreign and damaged files raise ValueError, a missing file loads as None"""
+
+    print("Testing bad files:")
+    print("-" * 50)
+
+    check("missing file loads as None", load_visited(filename + '.missing') is None)
+
+    def rejected(content):
+        with open(filename, 'wb') as f:
+            f.write(content)
+        try:
+            load_visited(filename)
+        except ValueError:
+            return True
+        return False
+
+    save_visited(make_visited('bloom', capacity=100), filename)
+    with open(filename, 'rb') as f:
+        valid = f.read()
+    check("foreign file rejected", rejected(b'{"products": []}\n'))
+    check("empty file rejected", rejected(b''))
+    check("damaged header rejected", rejected(valid.replace(b'"mode"', b'"mood"')))
+    check("truncated payload rejected", rejected(valid[:-4]))
+    print()
+
+
+def save_two_page_brand(directory):
+    """A replayable site with one brand: products 100-104 on page 1, 200-204 on page 2"""
+    site = 'https://aristohk.com'
+    pages = [(f"{site}/", b'<html><body><a href="/rolex">rolex</a></body></html>')]
+    for page, ids in ((1, range(100, 105)), (2, range(200, 205))):
+        links = ''.join(f'<a href="/rolex/model-{i}/{i}">x</a>' for i in ids)
+        url = f"{site}/rolex" if page == 1 else f"{site}/rolex?page={page}"
+        pages.append((url, f'<html><body>{links}<a href="/rolex?page=1">1</a><a href="/rolex?page=2">2</a>'
+                           f'</body></html>'.encode()))
+        for i in ids:
+            pages.append((f"{site}/rolex/model-{i}/{i}",
+                          f'<html><body><h1>ROLEX MODEL-{i}</h1><p>HK$120,000</p></body></html>'.encode()))
+    save_corpus(directory, pages)
+
+
+def test_known_first_page(directory):
+    """A first listing page of known products must not end the crawl before the new ones on page 2"""
+
+    print("Testing a crawl whose first listing page is all known:")
+    print("-" * 50)
+
+    save_two_page_brand(directory)
+    server = serve_corpus(directory)
+    try:
+        for engine in (AristoHKScraper, AsyncAristoHKScraper):
+            known_ids = make_visited('bitmap')
+            known_ids.update(range(100, 105))
+            scraper = engine(base_url=server.base_url, delay=0, probe_brands=False, known_ids=known_ids)
+            try:
+                if engine is AsyncAristoHKScraper:
+                    asyncio.run(scraper.scrape_all_async(specific_brand='rolex'))
+                else:
+                    scraper.scrape_all(specific_brand='rolex')
+            finally:
+                scraper.close()
+            check(f"{engine.__name__} scrapes the new products on page 2",
+                  set(scraper.scraped_ids) == set(range(200, 205)))
+            check(f"{engine.__name__} skips the known products on page 1", scraper.skipped_known == 5)
+    finally:
+        server.shutdown()
+    print()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'visited.ids')
+        test_bitmap_round_trip(filename)
+        test_bloom_round_trip(filename)
+        test_bad_files(filename)
+        test_known_first_page(os.path.join(directory, 'corpus'))
+
+    print("=" * 50)
+    print("All checks passed" if not failures else f"{failures} checks failed")
+    sys.exit(1 if failures else 0)
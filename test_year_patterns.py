@@ -6,8 +6,11 @@ Test year extraction patterns on actual product pages
 import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 
-def test_year_extraction(url):
+from aristohk_archive import PageArchive
+
+def test_year_extraction(url, archive=None):
     """Test year extraction on a specific URL"""
     
     print(f"Testing year extraction for: {url}")
@@ -18,10 +21,14 @@ def test_year_extraction(url):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        def fetch(url):
+            response = requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
+            return response.content
+        
+        content = archive.get_or_fetch(url, fetch) if archive else fetch(url)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
         all_text = soup.get_text()
         
         print("PAGE CONTENT SAMPLE (first 2000 chars):")
@@ -85,6 +92,9 @@ def test_year_extraction(url):
         print(f"Error: {e}")
 
 if __name__ == "__main__":
+    # Optional first argument: an archive written by aristohk_scraper.py --archive
+    archive = PageArchive(sys.argv[1]) if len(sys.argv) > 1 else None
+    
     # Test with a few URLs from the original response.json
     test_urls = [
         "https://aristohk.com/rolex/126610-ln-0001/25110",  # Rolex with null year
@@ -92,5 +102,5 @@ if __name__ == "__main__":
     ]
     
     for url in test_urls:
-        test_year_extraction(url)
+        test_year_extraction(url, archive)
         print("\n" + "="*80 + "\n")
\ No newline at end of file
@@ -6,8 +6,11 @@ Test with a specific URL that should have Release Year data
 import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 
-def find_release_year_thoroughly(url):
+from aristohk_archive import PageArchive
+
+def find_release_year_thoroughly(url, archive=None):
     """Thoroughly analyze the page structure to find Release Year"""
     
     print(f"Analyzing: {url}")
@@ -18,10 +21,14 @@ def find_release_year_thoroughly(url):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        def fetch(url):
+            response = requests.get(url, headers=headers, timeout=30)
+            response.raise_for_status()
+            return response.content
+        
+        content = archive.get_or_fetch(url, fetch) if archive else fetch(url)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
         all_text = soup.get_text()
         
         print("FULL PAGE TEXT SAMPLE (first 3000 chars):")
@@ -91,10 +98,13 @@ def find_release_year_thoroughly(url):
         print(f"Error: {e}")
 
 if __name__ == "__main__":
+    # Optional first argument: an archive written by aristohk_scraper.py --archive
+    archive = PageArchive(sys.argv[1]) if len(sys.argv) > 1 else None
+    
     # Let's try a URL from your original response.json that had year: 2023
     test_urls = [
         "https://aristohk.com/rolex/126500-ln-0002/18692",  # This one worked before
     ]
     
     for url in test_urls:
-        find_release_year_thoroughly(url)
\ No newline at end of file
+        find_release_year_thoroughly(url, archive)
\ No newline at end of file